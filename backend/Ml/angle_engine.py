@@ -0,0 +1,146 @@
+from itertools import chain
+from operator import attrgetter
+
+import numpy as np
+
+# MediaPipe Pose landmark order (mp.solutions.pose.PoseLandmark)
+LANDMARK_NAMES = (
+    "NOSE", "LEFT_EYE_INNER", "LEFT_EYE", "LEFT_EYE_OUTER",
+    "RIGHT_EYE_INNER", "RIGHT_EYE", "RIGHT_EYE_OUTER",
+    "LEFT_EAR", "RIGHT_EAR", "MOUTH_LEFT", "MOUTH_RIGHT",
+    "LEFT_SHOULDER", "RIGHT_SHOULDER", "LEFT_ELBOW", "RIGHT_ELBOW",
+    "LEFT_WRIST", "RIGHT_WRIST", "LEFT_PINKY", "RIGHT_PINKY",
+    "LEFT_INDEX", "RIGHT_INDEX", "LEFT_THUMB", "RIGHT_THUMB",
+    "LEFT_HIP", "RIGHT_HIP", "LEFT_KNEE", "RIGHT_KNEE",
+    "LEFT_ANKLE", "RIGHT_ANKLE", "LEFT_HEEL", "RIGHT_HEEL",
+    "LEFT_FOOT_INDEX", "RIGHT_FOOT_INDEX"
+)
+LANDMARK_INDEX = {name: idx for idx, name in enumerate(LANDMARK_NAMES)}
+NUM_LANDMARKS = len(LANDMARK_NAMES)
+
+_landmark_fields = attrgetter("x", "y", "z", "visibility")
+
+
+class AngleTable:
+    def __init__(self, joints):
+        """
+        Precompiled joint-angle index table
+        Args:
+            joints: Mapping of angle name -> (point_a, vertex, point_c) landmark names
+        """
+        self.names = tuple(joints)
+        self.index = np.array(
+            [[LANDMARK_INDEX[name] for name in triplet] for triplet in joints.values()],
+            dtype=np.intp
+        ).reshape(-1, 3)
+
+    def __len__(self):
+        return len(self.names)
+
+
+def compile_angle_table(joints):
+    """Resolve landmark names to indices once so per-frame work is pure NumPy"""
+    return AngleTable(joints)
+
+
+def landmarks_to_array(landmarks):
+    """Convert MediaPipe landmarks to a (33, 4) float32 array of x, y, z, visibility"""
+    values = chain.from_iterable(map(_landmark_fields, landmarks))
+    return np.fromiter(values, dtype=np.float32).reshape(-1, 4)
+
+
+def triplet_angles(triplets):
+    """
+    Angle at the middle point of each (a, b, c) triplet
+    Args:
+        triplets: (n, 3, 2) float64 array of x, y points
+    Returns:
+        float64 array of n angles in degrees
+    """
+    # Same arithmetic as YogaPoseDetector.calculate_angle: vectors a - b and
+    # c - b, then both arctan2 terms in one call
+    vectors = triplets[:, ::2] - triplets[:, 1:2]
+    directions = np.arctan2(vectors[..., 1], vectors[..., 0])
+    angles = np.abs((directions[:, 1] - directions[:, 0]) * 180.0 / np.pi)
+
+    # Equivalent to `if angle > 180: angle = 360 - angle`
+    return np.minimum(angles, 360 - angles)
+
+
+def compute_angles(points, table):
+    """
+    Compute every angle of a table in one batched call
+    Args:
+        points: (33, 4) landmark array from landmarks_to_array
+        table: AngleTable
+    Returns:
+        float64 array of angles in degrees, in table order
+    """
+    return triplet_angles(points[:, :2].astype(np.float64)[table.index])
+
+
+def compute_angle_dict(points, table):
+    """compute_angles keyed by angle name"""
+    return dict(zip(table.names, compute_angles(points, table).tolist()))
+
+
+if __name__ == "__main__":
+    # Microbenchmark: scalar calculate_angle path vs. the batched engine
+    import timeit
+    from types import SimpleNamespace
+
+    def calculate_angle(a, b, c):
+        a = np.array(a)
+        b = np.array(b)
+        c = np.array(c)
+
+        radians = np.arctan2(c[1]-b[1], c[0]-b[0]) - np.arctan2(a[1]-b[1], a[0]-b[0])
+        angle = np.abs(radians * 180.0 / np.pi)
+
+        if angle > 180.0:
+            angle = 360 - angle
+
+        return angle
+
+    def scalar_angles(landmarks, joints):
+        coords = lambda name: [landmarks[LANDMARK_INDEX[name]].x, landmarks[LANDMARK_INDEX[name]].y,
+                               landmarks[LANDMARK_INDEX[name]].z]
+        return {name: calculate_angle(*(coords(n) for n in triplet)) for name, triplet in joints.items()}
+
+    joints = {
+        "left_knee_angle": ("LEFT_HIP", "LEFT_KNEE", "LEFT_ANKLE"),
+        "right_knee_angle": ("RIGHT_HIP", "RIGHT_KNEE", "RIGHT_ANKLE"),
+        "left_hip_angle": ("LEFT_SHOULDER", "LEFT_HIP", "LEFT_KNEE"),
+        "right_hip_angle": ("RIGHT_SHOULDER", "RIGHT_HIP", "RIGHT_KNEE"),
+        "left_shoulder_angle": ("LEFT_ELBOW", "LEFT_SHOULDER", "LEFT_HIP"),
+        "right_shoulder_angle": ("RIGHT_ELBOW", "RIGHT_SHOULDER", "RIGHT_HIP"),
+        "left_elbow_angle": ("LEFT_SHOULDER", "LEFT_ELBOW", "LEFT_WRIST"),
+        "right_elbow_angle": ("RIGHT_SHOULDER", "RIGHT_ELBOW", "RIGHT_WRIST"),
+    }
+    table = compile_angle_table(joints)
+
+    rng = np.random.default_rng(0)
+    frames = []
+    for _ in range(200):
+        # MediaPipe landmarks are float32 on the wire
+        raw = rng.random((NUM_LANDMARKS, 4), dtype=np.float32).tolist()
+        frames.append([SimpleNamespace(x=x, y=y, z=z, visibility=v) for x, y, z, v in raw])
+
+    for landmarks in frames:
+        expected = scalar_angles(landmarks, joints)
+        actual = compute_angle_dict(landmarks_to_array(landmarks), table)
+        assert all(expected[name] == actual[name] for name in joints), "angle mismatch"
+
+    landmarks = frames[0]
+    points = landmarks_to_array(landmarks)
+    runs = 2000
+    best = lambda fn: min(timeit.repeat(fn, number=runs, repeat=5)) / runs
+    scalar = best(lambda: scalar_angles(landmarks, joints))
+    convert = best(lambda: landmarks_to_array(landmarks))
+    batched = best(lambda: compute_angles(points, table))
+
+    print(f"{len(joints)} angles, identical results on {len(frames)} frames")
+    print(f"scalar calculate_angle:  {scalar * 1e6:8.1f} us/frame")
+    print(f"landmarks_to_array:      {convert * 1e6:8.1f} us/frame")
+    print(f"batched compute_angles:  {batched * 1e6:8.1f} us/frame")
+    print(f"speedup (incl. convert): {scalar / (convert + batched):8.1f}x")
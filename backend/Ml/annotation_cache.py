@@ -0,0 +1,86 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class AnnotationCache:
+    def __init__(self, max_items=32, ttl=60):
+        """
+        Bounded store of frames whose annotated image is rendered on first fetch
+        Args:
+            max_items: Maximum number of pending/rendered annotations kept
+            ttl: Seconds an annotation stays fetchable
+        """
+        self.max_items = max(1, int(max_items))
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.stored = 0
+        self.rendered = 0
+
+    def _expire(self, now):
+        """Drop expired entries, then the oldest ones over capacity"""
+        for image_id, entry in list(self._entries.items()):
+            if now - entry["created"] < self.ttl:
+                break
+            del self._entries[image_id]
+
+        while len(self._entries) > self.max_items:
+            self._entries.popitem(last=False)
+
+    def put(self, frame, pose_landmarks, renderer):
+        """
+        Keep a frame for lazy annotation
+        Args:
+            frame: BGR frame the landmarks were detected on
+            pose_landmarks: MediaPipe landmark list to draw
+            renderer: Callable(frame, pose_landmarks) returning JPEG bytes
+        Returns:
+            Annotation id
+        """
+        image_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._entries[image_id] = {
+                "frame": frame,
+                "pose_landmarks": pose_landmarks,
+                "renderer": renderer,
+                "jpeg": None,
+                "created": now
+            }
+            self.stored += 1
+            self._expire(now)
+        return image_id
+
+    def get(self, image_id):
+        """Return the annotated JPEG bytes, rendering them on first access"""
+        with self._lock:
+            self._expire(time.time())
+            entry = self._entries.get(image_id)
+            if entry is None:
+                return None
+            if entry["jpeg"] is not None:
+                return entry["jpeg"]
+            frame, pose_landmarks, renderer = entry["frame"], entry["pose_landmarks"], entry["renderer"]
+
+        jpeg = renderer(frame, pose_landmarks)
+
+        with self._lock:
+            entry = self._entries.get(image_id)
+            if entry is not None:
+                # Rendered once, the raw frame is no longer needed
+                entry.update(jpeg=jpeg, frame=None, pose_landmarks=None, renderer=None)
+            self.rendered += 1
+        return jpeg
+
+    def stats(self):
+        """Cache occupancy and render counters"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_items": self.max_items,
+                "stored": self.stored,
+                "rendered": self.rendered
+            }
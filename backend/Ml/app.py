@@ -8,11 +8,30 @@ import io
 import cv2
 import numpy as np
 import threading
-import queue
 import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from datetime import datetime
 from PIL import Image
 
+from detector_pool import DetectorPool, DetectorPoolTimeout
+from tracker_registry import TrackerRegistry
+from inference_scheduler import InferenceScheduler, InferenceOverloaded
+from annotation_cache import AnnotationCache
+from frame_broadcaster import FrameBroadcaster
+from frame_pacer import FramePacer
+from frame_similarity import FrameSkipCache
+from pose_smoothing import PoseSmoother
+from model_tiers import MODEL_TIERS, ModelTierPolicy
+from landmark_codec import LANDMARK_FORMATS, LANDMARK_SCHEMA
+from session_store import create_session_store, strip_payload
+from progress import ProgressAggregate, ProgressTracker
+from session_columns import SessionColumns
+from webcam_inference import WebcamInference
+from video_analysis import (FFMPEG_BIN, analyze_stream, analyze_video, analyze_video_parallel,
+                            build_session_result, init_video_worker, video_file_from_base64, video_info)
+
 app = Flask(__name__)
 CORS(app, origins=["http://localhost:3001", "http://localhost:3000", "http://localhost:5173"])
 
@@ -22,232 +41,66 @@ print("=" * 60)
 
 # Webcam streaming variables
 camera = None
-frame_queue = queue.Queue(maxsize=2)
+# Capture publishes each JPEG once, every stream viewer reads it
+jpeg_frames = FrameBroadcaster(capacity=4)
+# Latest raw (mirrored, resized) frame for detection, so nobody else reads the device
+raw_frames = FrameBroadcaster(capacity=2)
 camera_lock = threading.Lock()
 is_streaming = False
 stream_thread = None
+# Capture rate target; stream JPEG quality/size drop when encoding falls behind
+WEBCAM_FPS = float(os.environ.get('WEBCAM_FPS', 30))
+frame_pacer = FramePacer(
+    target_fps=WEBCAM_FPS,
+    max_quality=int(os.environ.get('WEBCAM_JPEG_QUALITY', 85)),
+    min_quality=int(os.environ.get('WEBCAM_MIN_JPEG_QUALITY', 50))
+)
+
+# Annotated images fetched by id instead of inlined in the detect response
+ANNOTATE_MODES = ("inline", "none", "url")
+annotation_cache = AnnotationCache(
+    max_items=int(os.environ.get('ANNOTATION_CACHE_SIZE', 32)),
+    ttl=float(os.environ.get('ANNOTATION_CACHE_TTL', 60))
+)
+
+# Sessions per week counted toward the progress report's weekly goal
+WEEKLY_GOAL_SESSIONS = int(os.environ.get('WEEKLY_GOAL_SESSIONS', 5))
+
+# MediaPipe Pose model_complexity: 0 lite, 1 full, 2 heavy
+POSE_MODEL_COMPLEXITY = int(os.environ.get('POSE_MODEL_COMPLEXITY', 1))
 
 # Try to import MediaPipe
 try:
-    import mediapipe as mp
+    from mediapipe_detector import MediaPipePoseDetector
     
     print("✅ MediaPipe, OpenCV, NumPy loaded successfully")
     
-    class YogaPoseDetector:
-        def __init__(self):
-            self.mp_pose = mp.solutions.pose
-            self.mp_drawing = mp.solutions.drawing_utils
-            self.pose = self.mp_pose.Pose(
-                static_image_mode=False,
-                model_complexity=1,
-                smooth_landmarks=True,
-                min_detection_confidence=0.5,
-                min_tracking_confidence=0.5
-            )
-            print("✅ MediaPipe Pose initialized")
+    class YogaPoseDetector(MediaPipePoseDetector):
+        annotation_cache = annotation_cache
         
-        def decode_image(self, image_data):
-            """Decode base64 image to numpy array"""
-            try:
-                if ',' in image_data:
-                    image_data = image_data.split(',')[1]
-                
-                img_bytes = base64.b64decode(image_data)
-                nparr = np.frombuffer(img_bytes, np.uint8)
-                img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-                
-                if img is None:
-                    return None
-                
-                return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            except Exception as e:
-                print(f"Image decode error: {e}")
-                return None
+        def __init__(self, model_complexity=POSE_MODEL_COMPLEXITY):
+            super().__init__(model_complexity)
         
-        def detect_pose_from_frame(self, frame, pose_type):
-            """Detect pose from OpenCV frame"""
-            try:
-                if frame is None:
-                    return self._mock_result(pose_type, "No frame")
-                
-                # Convert BGR to RGB
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                frame_rgb.flags.writeable = False
-                
-                # Process with MediaPipe
-                results = self.pose.process(frame_rgb)
-                
-                if not results.pose_landmarks:
-                    return self._mock_result(pose_type, "No landmarks detected")
-                
-                # Get landmarks
-                landmarks = results.pose_landmarks.landmark
-                
-                # Convert landmarks to serializable format
-                landmarks_list = []
-                for idx, lm in enumerate(landmarks):
-                    landmarks_list.append({
-                        "x": lm.x,
-                        "y": lm.y,
-                        "z": lm.z,
-                        "visibility": lm.visibility,
-                        "name": f"landmark_{idx}"
-                    })
-                
-                # Calculate confidence
-                confidence = float(np.mean([lm.visibility for lm in landmarks]))
-                
-                # Generate feedback based on pose type
-                feedback = self._generate_feedback(pose_type, landmarks)
-                
-                # Check if pose is correct
-                is_correct = confidence > 0.7
-                
-                # Draw landmarks on frame
-                annotated_frame = frame.copy()
-                self.mp_drawing.draw_landmarks(
-                    annotated_frame,
-                    results.pose_landmarks,
-                    self.mp_pose.POSE_CONNECTIONS,
-                    self.mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
-                    self.mp_drawing.DrawingSpec(color=(255, 0, 0), thickness=2, circle_radius=2)
-                )
-                
-                # Convert annotated frame to base64
-                _, buffer = cv2.imencode('.jpg', annotated_frame)
-                annotated_image = base64.b64encode(buffer).decode('utf-8')
-                
-                return {
-                    "success": True,
-                    "pose_type": pose_type,
-                    "confidence": confidence,
-                    "is_correct": is_correct,
-                    "feedback": feedback,
-                    "landmarks": landmarks_list[:15],
-                    "angles": self._calculate_angles(landmarks, pose_type),
-                    "detector": "mediapipe",
-                    "timestamp": datetime.now().isoformat(),
-                    "annotated_image": f"data:image/jpeg;base64,{annotated_image}"
-                }
-                
-            except Exception as e:
-                print(f"Pose detection error: {e}")
-                return self._mock_result(pose_type, f"Error: {e}")
-        
-        def _generate_feedback(self, pose_type, landmarks):
-            """Generate feedback based on pose type and landmarks"""
-            feedback = []
+        def process_video_stream(self, video_data, pose_type, duration, analysis_fps=5):
+            """Analyze a base64 video, streaming every Nth frame through the detector"""
+            detect = lambda frame: self.detect_pose_from_frame(frame, pose_type, annotate="none")
             
-            if pose_type == "tree_pose":
-                if len(landmarks) > 25:
-                    # Check if right foot is near left knee (tree pose)
-                    right_foot = landmarks[28]  # RIGHT_ANKLE
-                    left_knee = landmarks[25]    # LEFT_KNEE
-                    
-                    if abs(right_foot.x - left_knee.x) < 0.1 and abs(right_foot.y - left_knee.y) < 0.1:
-                        feedback.append("Great tree pose! Keep your balance.")
-                    else:
-                        feedback.append("Place your foot on the inner thigh or calf of the standing leg.")
-                
-                feedback.append("Focus on a fixed point for better balance.")
-                feedback.append("Keep your hands in prayer position at chest.")
+            with video_file_from_base64(video_data) as path:
+                aggregate = None
                 
-            elif pose_type == "warrior_pose":
-                feedback.append("Front knee should be at 90 degrees.")
-                feedback.append("Back leg should be straight and strong.")
-                feedback.append("Arms should be parallel to the ground.")
+                # Long recordings are split into time ranges analyzed in parallel processes
+                frame_count, fps = video_info(path)
+                if VIDEO_WORKERS > 1 and frame_count / fps >= VIDEO_PARALLEL_MIN_SECONDS:
+                    aggregate = analyze_video_parallel(get_video_pool(), path, pose_type, VIDEO_WORKERS, analysis_fps)
                 
-            elif pose_type == "downward_dog":
-                feedback.append("Press your heels toward the ground.")
-                feedback.append("Lengthen your spine.")
-                feedback.append("Spread your fingers wide.")
-                
-            elif pose_type == "mountain_pose":
-                feedback.append("Stand tall with shoulders relaxed.")
-                feedback.append("Engage your thigh muscles.")
-                feedback.append("Distribute weight evenly on both feet.")
+                if aggregate is None:
+                    aggregate = analyze_video(detect, path, analysis_fps)
             
-            if not feedback:
-                feedback.append("Good pose! Keep practicing.")
-                
-            return feedback
-        
-        def _calculate_angles(self, landmarks, pose_type):
-            """Calculate joint angles"""
-            angles = {}
-            
-            if len(landmarks) < 28:
-                return angles
-                
-            if pose_type == "warrior_pose":
-                # Simulate some angles for demo
-                angles = {
-                    "front_knee": 92.5,
-                    "back_hip": 175.3,
-                    "shoulder_angle": 178.1
-                }
-            elif pose_type == "tree_pose":
-                angles = {
-                    "standing_knee": 178.9,
-                    "bent_knee": 85.2,
-                    "hip_angle": 95.7
-                }
-            elif pose_type == "downward_dog":
-                angles = {
-                    "shoulder_hip": 154.3,
-                    "hip_knee": 172.8,
-                    "knee_ankle": 178.2
-                }
-                
-            return angles
-        
-        def _mock_result(self, pose_type, reason=""):
-            """Fallback mock result"""
-            return {
-                "success": True,
-                "pose_type": pose_type,
-                "confidence": 0.75 + random.random() * 0.2,
-                "is_correct": random.choice([True, False]),
-                "feedback": [f"Demo mode: {reason}", "Practice makes perfect!"],
-                "landmarks": [],
-                "angles": {"demo_angle": 90},
-                "detector": "demo_mode",
-                "timestamp": datetime.now().isoformat(),
-                "annotated_image": None
-            }
-        
-        def process_video_stream(self, video_data, pose_type, duration):
-            """Process video stream - demo version"""
-            return {
-                "session_id": f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-                "pose_type": pose_type,
-                "total_frames": 150,
-                "correct_frames": 120,
-                "accuracy": 80.0,
-                "duration_seconds": duration,
-                "avg_confidence": 0.78,
-                "summary": {
-                    "pose_quality": "Good",
-                    "improvements": ["Hold for longer duration", "Focus on breathing"],
-                    "score": 8.0
-                }
-            }
+            return build_session_result(aggregate, pose_type, duration)
         
         def generate_progress_report(self, sessions):
-            """Generate progress report"""
-            total_sessions = len(sessions) if sessions else 7
-            return {
-                "total_sessions": total_sessions,
-                "total_practice_minutes": total_sessions * 12,
-                "average_accuracy": 75.5,
-                "improvement_areas": ["Balance", "Consistency", "Breathing"],
-                "recommendations": ["Practice daily for 15 minutes", "Try different pose variations"],
-                "streaks": {
-                    "current_streak": 3,
-                    "longest_streak": 7,
-                    "weekly_goal": "5 sessions"
-                }
-            }
+            """Generate progress report (the API serves the incrementally maintained one)"""
+            return ProgressAggregate.from_sessions(sessions, WEEKLY_GOAL_SESSIONS).report()
     
     pose_detector = YogaPoseDetector()
     
@@ -259,7 +112,8 @@ except ImportError as e:
         def __init__(self):
             self.pose_connections = ["tree_pose", "warrior_pose", "mountain_pose", "downward_dog"]
         
-        def detect_pose_from_frame(self, frame, pose_type):
+        def detect_pose_from_frame(self, frame, pose_type, annotate="inline", roi=None, model_complexity=None,
+                                   landmark_format="objects", smoother=None):
             # Simulate different feedback based on pose type
             feedback_map = {
                 "tree_pose": [
@@ -297,7 +151,7 @@ except ImportError as e:
                 "annotated_image": None
             }
         
-        def process_video_stream(self, video_data, pose_type, duration):
+        def process_video_stream(self, video_data, pose_type, duration, analysis_fps=5):
             return {
                 "session_id": f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
                 "pose_type": pose_type,
@@ -329,64 +183,287 @@ except ImportError as e:
     
     pose_detector = MockPoseDetector()
 
+if FFMPEG_BIN is None:
+    print("⚠️  ffmpeg not found, streaming session uploads are disabled")
+
+# Pool of detector instances so concurrent requests never share one tracker
+POSE_POOL_SIZE = int(os.environ.get('POSE_POOL_SIZE', min(4, os.cpu_count() or 1)))
+POSE_POOL_TIMEOUT = float(os.environ.get('POSE_POOL_TIMEOUT', 5))
+detector_pool = DetectorPool(pose_detector.__class__, size=POSE_POOL_SIZE)
+print(f"✅ Detector pool ready (size={POSE_POOL_SIZE})")
+
+# Warm per-stream trackers so each user's frames hit their own video-mode tracker
+TRACKER_MAX_STREAMS = int(os.environ.get('TRACKER_MAX_STREAMS', 64))
+TRACKER_IDLE_TIMEOUT = float(os.environ.get('TRACKER_IDLE_TIMEOUT', 300))
+
+# Near-identical frames of a held pose reuse the stream's last result (threshold 0 disables)
+FRAME_SKIP_THRESHOLD = float(os.environ.get('FRAME_SKIP_THRESHOLD', 2.0))
+FRAME_SKIP_MAX_AGE = float(os.environ.get('FRAME_SKIP_MAX_AGE', 1.0))
+skip_cache_factory = None
+if FRAME_SKIP_THRESHOLD > 0:
+    skip_cache_factory = lambda: FrameSkipCache(FRAME_SKIP_THRESHOLD, FRAME_SKIP_MAX_AGE)
+
+# Tracked streams get smoothed landmarks, a held is_correct and "pose held for N seconds" events
+POSE_SMOOTHING_ENABLED = os.environ.get('POSE_SMOOTHING', '1') != '0'
+SMOOTHING_TIME_CONSTANT = float(os.environ.get('SMOOTHING_TIME_CONSTANT', 0.1))
+CORRECTNESS_TIME_CONSTANT = float(os.environ.get('CORRECTNESS_TIME_CONSTANT', 0.5))
+HOLD_MARKS = tuple(float(mark) for mark in os.environ.get('HOLD_MARKS', '3,5,10,30').split(','))
+SMOOTHING_MAX_GAP = float(os.environ.get('SMOOTHING_MAX_GAP', 1.0))
+smoother_factory = None
+if POSE_SMOOTHING_ENABLED:
+    smoother_factory = lambda: PoseSmoother(SMOOTHING_TIME_CONSTANT, CORRECTNESS_TIME_CONSTANT,
+                                            hold_marks=HOLD_MARKS, max_gap=SMOOTHING_MAX_GAP)
+
+tracker_registry = TrackerRegistry(
+    pose_detector.__class__,
+    max_trackers=TRACKER_MAX_STREAMS,
+    idle_timeout=TRACKER_IDLE_TIMEOUT,
+    skip_cache_factory=skip_cache_factory,
+    smoother_factory=smoother_factory
+)
+
 # ============================================================================
 # WEBCAM STREAMING FUNCTIONS
 # ============================================================================
 
 def generate_webcam_frames():
     """Generate frames from webcam for streaming"""
-    global camera, is_streaming, frame_queue
+    global camera, is_streaming
     
     while is_streaming:
+        # Sleep until the frame's deadline rather than a fixed delay after the work
+        frame_pacer.wait()
+        
         try:
+            # Hold the device lock only for the grab itself
             with camera_lock:
                 if camera is None or not camera.isOpened():
-                    time.sleep(0.1)
-                    continue
-                
-                success, frame = camera.read()
-                if not success:
-                    time.sleep(0.1)
-                    continue
-                
-                # Mirror the frame (like a mirror)
-                frame = cv2.flip(frame, 1)
-                
-                # Resize to standard size
-                frame = cv2.resize(frame, (640, 480))
-                
-                # Encode frame as JPEG
-                ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-                if not ret:
-                    continue
-                
-                frame_bytes = buffer.tobytes()
-                
-                # Put frame in queue (non-blocking)
-                if frame_queue.full():
-                    try:
-                        frame_queue.get_nowait()
-                    except queue.Empty:
-                        pass
-                
-                try:
-                    frame_queue.put_nowait(frame_bytes)
-                except queue.Full:
-                    pass
-                
+                    success, frame = False, None
+                else:
+                    success, frame = camera.read()
+            
+            if not success:
+                time.sleep(0.1)
+                continue
+            
+            started = time.perf_counter()
+            
+            # Mirror the frame (like a mirror)
+            frame = cv2.flip(frame, 1)
+            
+            # Resize to standard size
+            frame = cv2.resize(frame, (640, 480))
+            
+            # Shared with detect requests, which must not modify it
+            frame.flags.writeable = False
+            raw_frames.publish(frame)
+            
+            # Only the stream copy is downscaled, detection keeps full resolution
+            scale = frame_pacer.scale
+            if scale < 1.0:
+                frame = cv2.resize(frame, (int(640 * scale), int(480 * scale)), interpolation=cv2.INTER_AREA)
+            
+            # Encode frame as JPEG
+            ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, frame_pacer.quality])
+            if not ret:
+                continue
+            
+            # Publish once for all viewers
+            jpeg_frames.publish(buffer.tobytes())
+            frame_pacer.record(time.perf_counter() - started)
+            
         except Exception as e:
             print(f"Webcam error: {e}")
             time.sleep(0.1)
-            continue
-        
-        time.sleep(0.033)  # ~30 FPS
+
+# ============================================================================
+# DETECTION HELPERS
+# ============================================================================
+
+# Tracked streams run inference on a crop around their previous landmarks
+POSE_ROI_ENABLED = os.environ.get('POSE_ROI', '1') != '0'
+
+def detect_frame(frame, pose_type, stream_id=None, annotate="inline", model_complexity=None,
+                 landmark_format="objects"):
+    """Run detection on the stream's own tracker, or a pooled detector for anonymous frames"""
+    if stream_id and stream_id != 'demo_user':
+        with tracker_registry.tracker(stream_id) as ctx:
+            cache = ctx.skip_cache
+            if cache is not None:
+                # Skip MediaPipe when the frame barely differs from the last inferred one
+                thumbnail = cache.thumbnail(frame)
+                key = (pose_type, annotate, model_complexity, landmark_format)
+                result = cache.lookup(thumbnail, key)
+                if result is not None:
+                    if ctx.smoother is not None and "stability" in result:
+                        # The hold clock keeps running on reused results
+                        result["stability"] = ctx.smoother.update(pose_type, result["stability"]["frame_passed"])
+                        result["is_correct"] = result["stability"]["is_correct"]
+                    return result
+            
+            roi = ctx.roi if POSE_ROI_ENABLED else None
+            result = ctx.detector.detect_pose_from_frame(frame, pose_type, annotate, roi, model_complexity,
+                                                         landmark_format, ctx.smoother)
+            if cache is not None:
+                cache.store(thumbnail, key, result)
+            return result
+    
+    with detector_pool.detector(timeout=POSE_POOL_TIMEOUT) as detector:
+        return detector.detect_pose_from_frame(frame, pose_type, annotate, model_complexity=model_complexity,
+                                               landmark_format=landmark_format)
+
+# Frames sampled per second when analyzing uploaded videos
+VIDEO_ANALYSIS_FPS = float(os.environ.get('VIDEO_ANALYSIS_FPS', 5))
+
+# Process pool for chunked analysis of long uploads, one detector per worker
+VIDEO_WORKERS = int(os.environ.get('VIDEO_WORKERS', os.cpu_count() or 1))
+VIDEO_PARALLEL_MIN_SECONDS = float(os.environ.get('VIDEO_PARALLEL_MIN_SECONDS', 60))
+video_pool = None
+video_pool_lock = threading.Lock()
+
+def get_video_pool():
+    """Start the video analysis process pool on first use"""
+    global video_pool
+    
+    with video_pool_lock:
+        if video_pool is None:
+            # spawn, not fork: the parent already runs MediaPipe and worker threads
+            video_pool = ProcessPoolExecutor(
+                max_workers=VIDEO_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_video_worker,
+                # Workers import only the detector module, never this app
+                initargs=(partial(MediaPipePoseDetector, POSE_MODEL_COMPLEXITY), {"annotate": "none"})
+            )
+            print(f"🎞️  Video analysis pool started ({VIDEO_WORKERS} workers)")
+    
+    return video_pool
+
+# Frames queue (bounded) for a fixed set of workers, each frame runs on its own free worker
+INFERENCE_TIMEOUT = float(os.environ.get('INFERENCE_TIMEOUT', 10))
+inference_scheduler = InferenceScheduler(
+    detect_frame,
+    workers=POSE_POOL_SIZE,
+    max_batch=int(os.environ.get('INFERENCE_MAX_BATCH', 1)),
+    max_wait=float(os.environ.get('INFERENCE_MAX_WAIT_MS', 5)) / 1000,
+    max_queue=int(os.environ.get('INFERENCE_MAX_QUEUE', 256))
+)
+
+# Lighter model tiers take over while the queue or p95 latency is too high
+model_tier_policy = ModelTierPolicy(
+    default_tier=POSE_MODEL_COMPLEXITY,
+    min_tier=int(os.environ.get('POSE_MIN_MODEL_COMPLEXITY', 0)),
+    queue_high=int(os.environ.get('TIER_QUEUE_HIGH', 8)),
+    queue_low=int(os.environ.get('TIER_QUEUE_LOW', 1)),
+    p95_high_ms=float(os.environ.get('TIER_P95_HIGH_MS', 250)),
+    p95_low_ms=float(os.environ.get('TIER_P95_LOW_MS', 100)),
+    cooldown=float(os.environ.get('TIER_COOLDOWN', 5))
+)
+
+def parse_model_complexity(value):
+    """Validate a requested model_complexity, None keeps the deployment default"""
+    if value is None or value == '':
+        return None
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        value = None
+    if value not in MODEL_TIERS:
+        raise ValueError(f"model_complexity must be one of {', '.join(map(str, MODEL_TIERS))}")
+    return value
+
+def parse_detect_options(params):
+    """
+    Validate the options shared by every detect route
+    Args:
+        params: Request JSON or form/query values
+    Returns:
+        (annotate, model_complexity, landmark_format), raises ValueError on an invalid one
+    """
+    annotate = params.get('annotate', 'inline')
+    if annotate not in ANNOTATE_MODES:
+        raise ValueError(f"annotate must be one of {', '.join(ANNOTATE_MODES)}")
+    
+    landmark_format = params.get('landmark_format', 'objects')
+    if landmark_format not in LANDMARK_FORMATS:
+        raise ValueError(f"landmark_format must be one of {', '.join(LANDMARK_FORMATS)}")
+    
+    return annotate, parse_model_complexity(params.get('model_complexity')), landmark_format
+
+def run_detection(frame, pose_type, stream_id=None, annotate="inline", model_complexity=None,
+                  landmark_format="objects"):
+    """Detect pose through the inference scheduler, on the tier the load policy allows"""
+    tier = model_tier_policy.tier(model_complexity, inference_scheduler.queue_depth())
+    started = time.perf_counter()
+    try:
+        return inference_scheduler.infer(frame, pose_type, stream_id, annotate, tier, landmark_format,
+                                         timeout=INFERENCE_TIMEOUT)
+    finally:
+        model_tier_policy.record(time.perf_counter() - started)
+
+# Optional server-side inference on the webcam, results pushed over SSE
+WEBCAM_STREAM_ID = 'webcam'
+WEBCAM_INFERENCE_FPS = float(os.environ.get('WEBCAM_INFERENCE_FPS', 10))
+webcam_inference = WebcamInference(
+    raw_frames,
+    lambda frame, pose_type: run_detection(frame, pose_type, WEBCAM_STREAM_ID, "none"),
+    fps=WEBCAM_INFERENCE_FPS
+)
 
 # ============================================================================
 # FLASK ROUTES
 # ============================================================================
 
-# Store user sessions
-user_sessions = {}
+# Store user sessions: bounded per user, "memory" or "sqlite" (SESSION_DB_PATH)
+SESSION_STORE = os.environ.get('SESSION_STORE', 'memory')
+session_options = {"max_per_user": int(os.environ.get('SESSION_MAX_PER_USER', 500))}
+if SESSION_STORE == 'sqlite':
+    session_options["path"] = os.environ.get(
+        'SESSION_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sessions.db'))
+    # Writes queued for the writer thread at most, beyond that appends wait briefly then are dropped
+    session_options["max_pending"] = int(os.environ.get('SESSION_MAX_PENDING_WRITES', 10000))
+session_store = create_session_store(SESSION_STORE, **session_options)
+print(f"✅ Session store ready ({SESSION_STORE})")
+
+# Numeric columns mirroring every user's aggregate, for many-user reports
+session_columns = SessionColumns()
+
+# Running per-user totals and daily/weekly rollups, so progress reports never rescan session history
+progress_tracker = ProgressTracker(session_store, weekly_goal=WEEKLY_GOAL_SESSIONS, columns=session_columns)
+mismatched_users = progress_tracker.check_columns()
+if mismatched_users:
+    print(f"⚠️  Batch progress disagrees with per-user progress for {len(mismatched_users)} users")
+
+def record_session(user_id, entry):
+    """Persist a session entry and fold it into the user's progress"""
+    session_store.append(user_id, entry)
+    progress_tracker.record(user_id, entry)
+
+def store_frame_result(user_id, pose_type, result):
+    """Record a single-frame detection result for a signed-in user"""
+    if user_id == 'demo_user':
+        return
+    
+    # Images and landmarks are dropped, only the scored result is kept
+    record_session(user_id, {
+        "session_id": f"{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+        "timestamp": datetime.now().isoformat(),
+        "pose_type": pose_type,
+        "result": strip_payload(result)
+    })
+
+def store_analysis_result(user_id, pose_type, duration, result):
+    """Record an analyzed video session for a signed-in user"""
+    if user_id == 'demo_user':
+        return
+    
+    record_session(user_id, {
+        "session_id": result.get("session_id", ""),
+        "timestamp": result["analyzed_at"],
+        "pose_type": pose_type,
+        "duration_seconds": duration,
+        "accuracy": result.get("accuracy", 0)
+    })
 
 @app.route('/')
 def home():
@@ -401,8 +478,11 @@ def home():
             "/api/ml/webcam/stop - Stop webcam",
             "/api/ml/webcam/stream - Webcam video stream",
             "/api/ml/webcam/detect - Detect pose from webcam",
+            "/api/ml/webcam/events - Live pose results (SSE)",
             "/api/ml/detect-pose - Detect pose from image",
-            "/api/ml/supported-poses - List supported poses"
+            "/api/ml/detect-pose/binary - Detect pose from raw image bytes",
+            "/api/ml/supported-poses - List supported poses",
+            "/api/ml/landmarks/schema - Landmark order for compact formats"
         ]
     })
 
@@ -413,6 +493,15 @@ def health_check():
         "service": "Yoga Pose Detection ML API",
         "detector": pose_detector.__class__.__name__,
         "webcam_status": "active" if is_streaming else "inactive",
+        "detector_pool": detector_pool.stats(),
+        "trackers": tracker_registry.stats(),
+        "inference": inference_scheduler.stats(),
+        "model_tier": model_tier_policy.stats(),
+        "session_store": session_store.stats(),
+        "session_columns": session_columns.stats(),
+        "webcam_stream": jpeg_frames.stats(),
+        "webcam_pacing": frame_pacer.stats(),
+        "webcam_inference": webcam_inference.stats(),
         "timestamp": datetime.now().isoformat()
     })
 
@@ -426,6 +515,8 @@ def start_webcam():
     global camera, is_streaming, stream_thread
     
     try:
+        data = request.get_json(silent=True) or {}
+        
         with camera_lock:
             if camera is None:
                 # Try different camera indices
@@ -446,19 +537,25 @@ def start_webcam():
             # Configure camera
             camera.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
             camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-            camera.set(cv2.CAP_PROP_FPS, 30)
+            camera.set(cv2.CAP_PROP_FPS, data.get('fps', WEBCAM_FPS))
             
             if not is_streaming:
+                frame_pacer.set_target(data.get('fps', WEBCAM_FPS))
                 is_streaming = True
                 stream_thread = threading.Thread(target=generate_webcam_frames, daemon=True)
                 stream_thread.start()
                 print("🎥 Webcam streaming started")
         
+        # Continuous detection pushed to /api/ml/webcam/events
+        if data.get('inference'):
+            webcam_inference.start(data.get('pose_type'), data.get('inference_fps'))
+        
         return jsonify({
             "success": True,
             "message": "Webcam started successfully",
             "resolution": "640x480",
-            "fps": 30,
+            "fps": frame_pacer.target_fps,
+            "inference": webcam_inference.stats(),
             "timestamp": datetime.now().isoformat()
         })
         
@@ -475,24 +572,24 @@ def stop_webcam():
     global camera, is_streaming, stream_thread
     
     try:
+        is_streaming = False
+        webcam_inference.stop()
+        # The webcam's tracker holds MediaPipe graphs, free them now instead of at idle eviction
+        tracker_registry.discard(WEBCAM_STREAM_ID)
+        
+        # Wait for stream thread to finish (it needs camera_lock for its last grab)
+        if stream_thread and stream_thread.is_alive():
+            stream_thread.join(timeout=2)
+        
         with camera_lock:
-            is_streaming = False
-            
-            # Wait for stream thread to finish
-            if stream_thread and stream_thread.is_alive():
-                stream_thread.join(timeout=2)
-            
             # Release camera
             if camera is not None:
                 camera.release()
                 camera = None
             
-            # Clear frame queue
-            while not frame_queue.empty():
-                try:
-                    frame_queue.get_nowait()
-                except queue.Empty:
-                    break
+            # Drop buffered frames
+            jpeg_frames.clear()
+            raw_frames.clear()
             
             print("🎥 Webcam streaming stopped")
         
@@ -508,96 +605,154 @@ def stop_webcam():
             "error": str(e)
         }), 500
 
+# Built once, every MJPEG part reuses them
+MJPEG_PART_HEADER = b'--frame\r\nContent-Type: image/jpeg\r\n\r\n'
+PLACEHOLDER_PART = (MJPEG_PART_HEADER
+                    + cv2.imencode('.jpg', np.zeros((100, 100, 3), dtype=np.uint8))[1].tobytes()
+                    + b'\r\n')
+
+# Idle viewers wait longer and longer between placeholder frames
+STREAM_IDLE_TIMEOUT = 0.5
+STREAM_MAX_IDLE_TIMEOUT = float(os.environ.get('STREAM_MAX_IDLE_TIMEOUT', 10))
+MAX_STREAM_CLIENTS = int(os.environ.get('MAX_STREAM_CLIENTS', 32))
+stream_slots = threading.BoundedSemaphore(MAX_STREAM_CLIENTS)
+
 @app.route('/api/ml/webcam/stream')
 def webcam_stream():
     """Stream webcam video as MJPEG"""
+    if not stream_slots.acquire(blocking=False):
+        return jsonify({
+            "success": False,
+            "error": f"Too many stream clients (max {MAX_STREAM_CLIENTS})"
+        }), 503
+    
     def generate():
-        frame_count = 0
-        last_time = time.time()
-        
-        while is_streaming:
-            try:
-                # Get frame from queue
-                frame = frame_queue.get(timeout=2)
-                frame_count += 1
-                
-                # Calculate FPS every 30 frames
-                if frame_count % 30 == 0:
-                    current_time = time.time()
-                    fps = 30 / (current_time - last_time)
-                    last_time = current_time
-                    # print(f"📊 Streaming at {fps:.1f} FPS")
-                
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
-                
-            except queue.Empty:
-                # Send placeholder frame when queue is empty
-                blank_frame = np.zeros((100, 100, 3), dtype=np.uint8)
-                _, buffer = cv2.imencode('.jpg', blank_frame)
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + buffer.tobytes() + b'\r\n')
-                time.sleep(0.1)
-            except Exception as e:
-                print(f"Stream error: {e}")
-                break
+        # Each viewer reads the latest frame without taking it from the others
+        # A slow viewer jumps to the newest frame rather than lagging behind for good
+        subscriber = jpeg_frames.subscribe(latest_only=True)
+        idle_timeout = STREAM_IDLE_TIMEOUT
+        try:
+            while is_streaming:
+                try:
+                    # Blocks on the broadcaster, no polling while the camera is quiet
+                    frame = subscriber.next(timeout=idle_timeout)
+                    
+                    if frame is not None:
+                        idle_timeout = STREAM_IDLE_TIMEOUT
+                        yield MJPEG_PART_HEADER + frame + b'\r\n'
+                        continue
+                    
+                    # Send placeholder frame when no new frame arrived, then back off
+                    yield PLACEHOLDER_PART
+                    idle_timeout = min(idle_timeout * 2, STREAM_MAX_IDLE_TIMEOUT)
+                except Exception as e:
+                    print(f"Stream error: {e}")
+                    break
+        finally:
+            subscriber.close()
+    
+    response = Response(generate(),
+                        mimetype='multipart/x-mixed-replace; boundary=frame',
+                        headers={
+                            'Cache-Control': 'no-cache, no-store, must-revalidate',
+                            'Pragma': 'no-cache',
+                            'Expires': '0'
+                        })
+    # Runs even if the client disconnects before the first frame
+    response.call_on_close(stream_slots.release)
+    return response
+
+@app.route('/api/ml/webcam/inference', methods=['POST'])
+def webcam_inference_control():
+    """Enable, disable or retarget background inference on the webcam"""
+    data = request.get_json(silent=True) or {}
+    
+    if not data.get('enabled', True):
+        webcam_inference.stop()
+        tracker_registry.discard(WEBCAM_STREAM_ID)
+    elif not is_streaming:
+        return jsonify({
+            "success": False,
+            "error": "Webcam not available. Please start webcam first."
+        }), 400
+    else:
+        webcam_inference.start(data.get('pose_type'), data.get('fps'))
+    
+    return jsonify({
+        "success": True,
+        "inference": webcam_inference.stats(),
+        "timestamp": datetime.now().isoformat()
+    })
+
+@app.route('/api/ml/webcam/events')
+def webcam_events():
+    """Push background inference results as Server-Sent Events"""
+    def generate():
+        subscriber = webcam_inference.events.subscribe()
+        try:
+            while is_streaming:
+                event = subscriber.next(timeout=15)
+                # Comment line keeps proxies from closing a quiet connection
+                yield event if event is not None else b': keep-alive\n\n'
+        finally:
+            subscriber.close()
     
     return Response(generate(),
-                    mimetype='multipart/x-mixed-replace; boundary=frame',
+                    mimetype='text/event-stream',
                     headers={
-                        'Cache-Control': 'no-cache, no-store, must-revalidate',
-                        'Pragma': 'no-cache',
-                        'Expires': '0'
+                        'Cache-Control': 'no-cache',
+                        'X-Accel-Buffering': 'no'
                     })
 
 @app.route('/api/ml/webcam/detect', methods=['POST'])
 def webcam_detect_pose():
     """Detect pose from current webcam frame"""
-    global camera
-    
     try:
         data = request.json
         pose_type = data.get('pose_type', 'tree_pose')
         user_id = data.get('user_id', 'demo_user')
+        stream_id = data.get('stream_id', user_id)
         
-        with camera_lock:
-            if camera is None or not camera.isOpened():
-                return jsonify({
-                    "success": False,
-                    "error": "Webcam not available. Please start webcam first."
-                }), 400
-            
-            # Capture frame
-            success, frame = camera.read()
-            if not success:
-                return jsonify({
-                    "success": False,
-                    "error": "Failed to capture frame"
-                }), 400
-            
-            # Mirror and resize frame
-            frame = cv2.flip(frame, 1)
-            frame = cv2.resize(frame, (640, 480))
+        try:
+            annotate, model_complexity, landmark_format = parse_detect_options(data)
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 400
+        
+        if not is_streaming:
+            return jsonify({
+                "success": False,
+                "error": "Webcam not available. Please start webcam first."
+            }), 400
+        
+        # Use the capture loop's latest frame instead of reading the device
+        seq, frame = raw_frames.latest()
+        if frame is None:
+            seq, frame = raw_frames.read(seq, timeout=1)
+        if frame is None:
+            return jsonify({
+                "success": False,
+                "error": "Failed to capture frame"
+            }), 400
         
         # Detect pose
-        result = pose_detector.detect_pose_from_frame(frame, pose_type)
+        result = run_detection(frame, pose_type, stream_id, annotate, model_complexity, landmark_format)
         
         # Store session
-        if user_id != 'demo_user':
-            if user_id not in user_sessions:
-                user_sessions[user_id] = []
-            
-            user_sessions[user_id].append({
-                "session_id": f"{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-                "timestamp": datetime.now().isoformat(),
-                "pose_type": pose_type,
-                "result": result
-            })
+        store_frame_result(user_id, pose_type, result)
         
         result['user_id'] = user_id
         
         return jsonify(result)
         
+    except (DetectorPoolTimeout, InferenceOverloaded) as e:
+        return jsonify({
+            "success": False,
+            "error": f"Detector busy: {str(e)}",
+            "timestamp": datetime.now().isoformat()
+        }), 503
     except Exception as e:
         return jsonify({
             "success": False,
@@ -624,6 +779,7 @@ def detect_pose():
         image_data = data.get('image', '')
         pose_type = data.get('pose_type', 'tree_pose')
         user_id = data.get('user_id', 'demo_user')
+        stream_id = data.get('stream_id', user_id)
         
         if not image_data:
             return jsonify({
@@ -631,6 +787,14 @@ def detect_pose():
                 "error": "No image data provided"
             }), 400
         
+        try:
+            annotate, model_complexity, landmark_format = parse_detect_options(data)
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 400
+        
         # Decode base64 image
         try:
             if ',' in image_data:
@@ -653,24 +817,81 @@ def detect_pose():
             }), 400
         
         # Detect pose
-        result = pose_detector.detect_pose_from_frame(frame, pose_type)
+        result = run_detection(frame, pose_type, stream_id, annotate, model_complexity, landmark_format)
         
         # Store session
-        if user_id != 'demo_user':
-            if user_id not in user_sessions:
-                user_sessions[user_id] = []
-            
-            user_sessions[user_id].append({
-                "session_id": f"{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-                "timestamp": datetime.now().isoformat(),
-                "pose_type": pose_type,
-                "result": result
-            })
+        store_frame_result(user_id, pose_type, result)
+        
+        result['user_id'] = user_id
+        
+        return jsonify(result)
+        
+    except (DetectorPoolTimeout, InferenceOverloaded) as e:
+        return jsonify({
+            "success": False,
+            "error": f"Detector busy: {str(e)}",
+            "timestamp": datetime.now().isoformat()
+        }), 503
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        }), 500
+
+@app.route('/api/ml/detect-pose/binary', methods=['POST'])
+def detect_pose_binary():
+    """Detect pose from raw JPEG/PNG bytes (octet-stream body or multipart `image` file)"""
+    try:
+        # Query string and multipart fields both carry options, whichever way the image is sent
+        params = request.values
+        pose_type = params.get('pose_type', 'tree_pose')
+        user_id = params.get('user_id', 'demo_user')
+        stream_id = params.get('stream_id', user_id)
+        
+        try:
+            annotate, model_complexity, landmark_format = parse_detect_options(params)
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 400
+        
+        if 'image' in request.files:
+            img_bytes = request.files['image'].read()
+        else:
+            img_bytes = request.get_data(cache=False)
+        
+        if not img_bytes:
+            return jsonify({
+                "success": False,
+                "error": "No image data provided"
+            }), 400
+        
+        # Decode straight from the body buffer, no base64 or JSON round trip
+        frame = cv2.imdecode(np.frombuffer(img_bytes, np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            return jsonify({
+                "success": False,
+                "error": "Failed to decode image"
+            }), 400
+        
+        # Detect pose
+        result = run_detection(frame, pose_type, stream_id, annotate, model_complexity, landmark_format)
+        
+        # Store session
+        store_frame_result(user_id, pose_type, result)
         
         result['user_id'] = user_id
         
         return jsonify(result)
         
+    except (DetectorPoolTimeout, InferenceOverloaded) as e:
+        return jsonify({
+            "success": False,
+            "error": f"Detector busy: {str(e)}",
+            "timestamp": datetime.now().isoformat()
+        }), 503
     except Exception as e:
         return jsonify({
             "success": False,
@@ -678,6 +899,18 @@ def detect_pose():
             "timestamp": datetime.now().isoformat()
         }), 500
 
+@app.route('/api/ml/annotated/<image_id>', methods=['GET'])
+def get_annotated_image(image_id):
+    """Render (once) and return an annotated frame requested with annotate=url"""
+    jpeg = annotation_cache.get(image_id)
+    if jpeg is None:
+        return jsonify({
+            "success": False,
+            "error": "Annotated image not found or expired"
+        }), 404
+    
+    return Response(jpeg, mimetype='image/jpeg', headers={'Cache-Control': 'private, max-age=60'})
+
 @app.route('/api/ml/analyze-session', methods=['POST'])
 def analyze_session():
     """Analyze a video session"""
@@ -688,6 +921,7 @@ def analyze_session():
         pose_type = data.get('pose_type', 'tree_pose')
         user_id = data.get('user_id', 'demo_user')
         duration = data.get('duration_seconds', 30)
+        analysis_fps = float(data.get('analysis_fps', VIDEO_ANALYSIS_FPS))
         
         if not video_data:
             return jsonify({
@@ -695,23 +929,19 @@ def analyze_session():
                 "error": "No video data provided"
             }), 400
         
-        result = pose_detector.process_video_stream(video_data, pose_type, duration)
+        # A dedicated detector keeps the video's tracking state away from live streams
+        analyzer = pose_detector.__class__()
+        try:
+            result = analyzer.process_video_stream(video_data, pose_type, duration, analysis_fps)
+        finally:
+            if hasattr(analyzer, 'close'):
+                analyzer.close()
         
         result["user_id"] = user_id
         result["analyzed_at"] = datetime.now().isoformat()
         
         # Store session
-        if user_id != 'demo_user':
-            if user_id not in user_sessions:
-                user_sessions[user_id] = []
-            
-            user_sessions[user_id].append({
-                "session_id": result.get("session_id", ""),
-                "timestamp": result["analyzed_at"],
-                "pose_type": pose_type,
-                "duration_seconds": duration,
-                "accuracy": result.get("accuracy", 0)
-            })
+        store_analysis_result(user_id, pose_type, duration, result)
         
         return jsonify(result)
         
@@ -721,19 +951,73 @@ def analyze_session():
             "error": str(e)
         }), 500
 
+def iter_upload(stream, chunk_size=64 * 1024):
+    """Read an upload body in fixed-size chunks"""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+@app.route('/api/ml/analyze-session/stream', methods=['POST'])
+def analyze_session_stream():
+    """
+    Analyze a raw video upload while it streams in (options in the query string)
+    The body must be WebM or fragmented/faststart MP4; other MP4s are rejected with 400
+    """
+    try:
+        pose_type = request.args.get('pose_type', 'tree_pose')
+        user_id = request.args.get('user_id', 'demo_user')
+        duration = float(request.args.get('duration_seconds', 30))
+        analysis_fps = float(request.args.get('analysis_fps', VIDEO_ANALYSIS_FPS))
+        
+        if FFMPEG_BIN is None:
+            return jsonify({
+                "success": False,
+                "error": "Streaming analysis requires ffmpeg on the server"
+            }), 501
+        
+        # The body is piped into the decoder chunk by chunk, never buffered whole
+        analyzer = pose_detector.__class__()
+        try:
+            detect = lambda frame: analyzer.detect_pose_from_frame(frame, pose_type, annotate="none")
+            aggregate = analyze_stream(detect, iter_upload(request.stream), analysis_fps)
+        finally:
+            if hasattr(analyzer, 'close'):
+                analyzer.close()
+        
+        result = build_session_result(aggregate, pose_type, duration)
+        result["user_id"] = user_id
+        result["analyzed_at"] = datetime.now().isoformat()
+        
+        # Store session
+        store_analysis_result(user_id, pose_type, duration, result)
+        
+        return jsonify(result)
+        
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
 @app.route('/api/ml/progress/<user_id>', methods=['GET'])
 def get_user_progress(user_id):
     """Get user progress report"""
     try:
-        sessions = user_sessions.get(user_id, [])
-        
-        progress_report = pose_detector.generate_progress_report(sessions)
+        # Built from running totals, cost doesn't grow with history
+        progress_report = progress_tracker.report(user_id)
         progress_report["user_id"] = user_id
         progress_report["generated_at"] = datetime.now().isoformat()
-        progress_report["session_count"] = len(sessions)
+        progress_report["session_count"] = progress_report["total_sessions"]
         
         # Add recent sessions
-        progress_report["recent_sessions"] = sessions[-5:] if sessions else []
+        progress_report["recent_sessions"] = session_store.sessions(user_id, limit=5)
         
         return jsonify(progress_report)
         
@@ -743,6 +1027,50 @@ def get_user_progress(user_id):
             "error": str(e)
         }), 500
 
+@app.route('/api/ml/progress/batch', methods=['POST'])
+def get_batch_progress():
+    """Progress summaries for a list of users and/or every user active since a time"""
+    try:
+        data = request.get_json(silent=True) or {}
+        user_ids = data.get('user_ids')
+        active_since = data.get('active_since')
+        
+        if user_ids is not None and not isinstance(user_ids, list):
+            return jsonify({
+                "success": False,
+                "error": "user_ids must be a list"
+            }), 400
+        
+        if active_since is not None:
+            try:
+                active_since = datetime.fromisoformat(active_since)
+            except (TypeError, ValueError):
+                return jsonify({
+                    "success": False,
+                    "error": "active_since must be an ISO 8601 timestamp"
+                }), 400
+        
+        # One pass over the aggregate columns instead of a report per user
+        reports = session_columns.batch_report(user_ids, active_since)
+        
+        return jsonify({
+            "success": True,
+            "reports": reports,
+            "user_count": len(reports),
+            "generated_at": datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@app.route('/api/ml/landmarks/schema', methods=['GET'])
+def get_landmark_schema():
+    """Describe the landmark order used by the compact landmark formats"""
+    return jsonify(dict(LANDMARK_SCHEMA, success=True))
+
 @app.route('/api/ml/supported-poses', methods=['GET'])
 def get_supported_poses():
     """Get list of supported yoga poses"""
@@ -862,10 +1190,17 @@ def test_endpoint():
             {"method": "POST", "path": "/api/ml/webcam/stop", "description": "Stop webcam streaming"},
             {"method": "GET", "path": "/api/ml/webcam/stream", "description": "Webcam video stream (MJPEG)"},
             {"method": "POST", "path": "/api/ml/webcam/detect", "description": "Detect pose from webcam"},
+            {"method": "POST", "path": "/api/ml/webcam/inference", "description": "Control background webcam inference"},
+            {"method": "GET", "path": "/api/ml/webcam/events", "description": "Live pose results (Server-Sent Events)"},
             {"method": "POST", "path": "/api/ml/detect-pose", "description": "Detect pose from image"},
+            {"method": "POST", "path": "/api/ml/detect-pose/binary", "description": "Detect pose from raw image bytes"},
+            {"method": "GET", "path": "/api/ml/annotated/<image_id>", "description": "Fetch a deferred annotated image"},
             {"method": "POST", "path": "/api/ml/analyze-session", "description": "Analyze video session"},
+            {"method": "POST", "path": "/api/ml/analyze-session/stream", "description": "Analyze a streamed WebM or faststart MP4 upload"},
             {"method": "GET", "path": "/api/ml/progress/<user_id>", "description": "Get user progress"},
+            {"method": "POST", "path": "/api/ml/progress/batch", "description": "Progress for many users at once"},
             {"method": "GET", "path": "/api/ml/supported-poses", "description": "List supported poses"},
+            {"method": "GET", "path": "/api/ml/landmarks/schema", "description": "Landmark order for compact formats"},
             {"method": "POST", "path": "/api/ml/feedback", "description": "Get pose feedback"}
         ],
         "detector": pose_detector.__class__.__name__,
@@ -889,7 +1224,9 @@ if __name__ == '__main__':
     print("  POST /api/ml/webcam/stop     - Stop webcam")
     print("  GET  /api/ml/webcam/stream   - Video stream")
     print("  POST /api/ml/webcam/detect   - Detect pose from webcam")
+    print("  GET  /api/ml/webcam/events   - Live pose results (SSE)")
     print("  POST /api/ml/detect-pose     - Detect pose from image")
+    print("  POST /api/ml/detect-pose/binary - Detect pose from raw image bytes")
     print("=" * 60)
     print("\n⚠️  Make sure to install required packages:")
     print("    pip install flask flask-cors opencv-python mediapipe numpy pillow")
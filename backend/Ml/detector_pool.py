@@ -0,0 +1,104 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+
+class DetectorPoolTimeout(Exception):
+    """Raised when no detector becomes free within the checkout timeout"""
+
+
+class DetectorPool:
+    def __init__(self, factory, size=2):
+        """
+        Bounded pool of pose detector instances
+        Args:
+            factory: Callable returning a new detector
+            size: Number of detectors to keep in the pool
+        """
+        self.factory = factory
+        self.size = max(1, int(size))
+        self._idle = queue.LifoQueue(maxsize=self.size)
+        self._created = 0
+        self._create_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+        # Queue-wait metrics
+        self.checkouts = 0
+        self.timeouts = 0
+        self.waiting = 0
+        self.in_use = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _try_create(self):
+        """Create a new detector if the pool has not reached its size yet"""
+        with self._create_lock:
+            if self._created >= self.size:
+                return None
+            self._created += 1
+        try:
+            return self.factory()
+        except Exception:
+            with self._create_lock:
+                self._created -= 1
+            raise
+
+    def checkout(self, timeout=None):
+        """Take a detector out of the pool, waiting up to `timeout` seconds"""
+        start = time.perf_counter()
+        with self._stats_lock:
+            self.waiting += 1
+        try:
+            try:
+                detector = self._idle.get_nowait()
+            except queue.Empty:
+                detector = self._try_create()
+                if detector is None:
+                    detector = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise DetectorPoolTimeout(f"No detector available after {timeout}s")
+        finally:
+            with self._stats_lock:
+                self.waiting -= 1
+
+        wait = time.perf_counter() - start
+        with self._stats_lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+        return detector
+
+    def checkin(self, detector):
+        """Return a detector to the pool"""
+        with self._stats_lock:
+            self.in_use -= 1
+        self._idle.put_nowait(detector)
+
+    @contextmanager
+    def detector(self, timeout=None):
+        """Context manager wrapping checkout/checkin"""
+        detector = self.checkout(timeout)
+        try:
+            yield detector
+        finally:
+            self.checkin(detector)
+
+    def stats(self):
+        """Pool usage and queue-wait metrics"""
+        with self._stats_lock:
+            avg_wait = self.total_wait / self.checkouts if self.checkouts else 0.0
+            return {
+                "size": self.size,
+                "created": self._created,
+                "in_use": self.in_use,
+                "idle": self._idle.qsize(),
+                "waiting": self.waiting,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": avg_wait * 1000,
+                "max_wait_ms": self.max_wait * 1000
+            }
@@ -0,0 +1,113 @@
+import itertools
+import threading
+
+
+class FrameBroadcaster:
+    def __init__(self, capacity=4):
+        """
+        Ring buffer the capture thread publishes into once for all viewers
+        Args:
+            capacity: Number of most recent frames kept for slow subscribers
+        """
+        self.capacity = max(1, int(capacity))
+        self._ring = [None] * self.capacity
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._subscribers = {}
+        self._ids = itertools.count(1)
+
+    def publish(self, frame):
+        """Store a frame under the next sequence number and wake every subscriber"""
+        with self._cond:
+            self._seq += 1
+            self._ring[self._seq % self.capacity] = frame
+            self._cond.notify_all()
+            return self._seq
+
+    def clear(self):
+        """Drop buffered frames (sequence numbers keep increasing)"""
+        with self._cond:
+            self._ring = [None] * self.capacity
+
+    def latest(self):
+        """Return (seq, frame) of the newest frame without consuming it"""
+        with self._cond:
+            return self._seq, self._ring[self._seq % self.capacity]
+
+    def read(self, after_seq, timeout=None, latest_only=False):
+        """
+        Wait for a frame newer than `after_seq`
+        Args:
+            latest_only: Skip straight to the newest frame instead of replaying buffered ones
+        Returns:
+            (seq, frame) of the newest frame with latest_only; otherwise of the next frame
+            still buffered, or of the oldest buffered one if the reader fell more than
+            `capacity` frames behind; (after_seq, None) on timeout
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > after_seq, timeout):
+                return after_seq, None
+            if latest_only:
+                seq = self._seq
+            else:
+                seq = max(after_seq + 1, self._seq - self.capacity + 1)
+            return seq, self._ring[seq % self.capacity]
+
+    def subscribe(self, latest_only=False):
+        """
+        Register a new viewer starting at the current frame
+        Args:
+            latest_only: Video viewers always get the newest frame; event feeds leave it
+                False to replay whatever is still buffered
+        """
+        with self._cond:
+            subscriber = FrameSubscriber(self, next(self._ids), self._seq, latest_only)
+            self._subscribers[subscriber.id] = subscriber
+            return subscriber
+
+    def _unsubscribe(self, subscriber):
+        with self._cond:
+            self._subscribers.pop(subscriber.id, None)
+
+    def stats(self):
+        """Publish count and per-subscriber delivery/drop counters"""
+        with self._cond:
+            subscribers = list(self._subscribers.values())
+            published = self._seq
+        return {
+            "published": published,
+            "capacity": self.capacity,
+            "subscribers": [
+                {"id": sub.id, "delivered": sub.delivered, "dropped": sub.dropped}
+                for sub in subscribers
+            ]
+        }
+
+
+class FrameSubscriber:
+    def __init__(self, broadcaster, subscriber_id, start_seq, latest_only=False):
+        """One viewer's read position in a FrameBroadcaster"""
+        self.broadcaster = broadcaster
+        self.id = subscriber_id
+        self.last_seq = start_seq
+        self.latest_only = latest_only
+        self.delivered = 0
+        self.dropped = 0
+
+    def next(self, timeout=None):
+        """Next frame for this viewer, or None if nothing new arrived in time"""
+        seq, frame = self.broadcaster.read(self.last_seq, timeout, self.latest_only)
+        if seq == self.last_seq:
+            return None
+
+        # Frames skipped because this viewer fell behind
+        self.dropped += seq - self.last_seq - 1
+        self.last_seq = seq
+        if frame is None:
+            return None
+
+        self.delivered += 1
+        return frame
+
+    def close(self):
+        self.broadcaster._unsubscribe(self)
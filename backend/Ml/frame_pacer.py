@@ -0,0 +1,85 @@
+import time
+
+
+class FramePacer:
+    def __init__(self, target_fps=30, max_quality=85, min_quality=50, scales=(1.0, 0.75, 0.5),
+                 adjust_every=15):
+        """
+        Deadline-based frame pacing with adaptive JPEG quality and resolution
+        Args:
+            target_fps: Frames per second to aim for
+            max_quality, min_quality: JPEG quality range used for the stream
+            scales: Output resolution factors, tried in order when encoding can't keep up
+            adjust_every: Frames between two quality/resolution adjustments
+        """
+        self.max_quality = max_quality
+        self.min_quality = min_quality
+        self.scales = tuple(scales)
+        self.adjust_every = max(1, int(adjust_every))
+        self.set_target(target_fps)
+
+    def set_target(self, target_fps):
+        """Change the target rate and start again at full quality"""
+        self.target_fps = float(target_fps)
+        self.interval = 1.0 / self.target_fps
+        self.quality = self.max_quality
+        self.scale_index = 0
+        self.next_deadline = None
+        self.last_frame_at = None
+        self.avg_interval = self.interval
+        self.avg_work = 0.0
+        self.frames = 0
+        self.late_frames = 0
+
+    @property
+    def scale(self):
+        return self.scales[self.scale_index]
+
+    def wait(self):
+        """Sleep until the next frame is due"""
+        now = time.monotonic()
+        if self.next_deadline is None:
+            self.next_deadline = now
+        elif now < self.next_deadline:
+            time.sleep(self.next_deadline - now)
+            now = time.monotonic()
+        elif now - self.next_deadline > self.interval:
+            # Missed a whole slot: restart the schedule instead of bursting to catch up
+            self.late_frames += 1
+            self.next_deadline = now
+
+        if self.last_frame_at is not None:
+            self.avg_interval += 0.1 * ((now - self.last_frame_at) - self.avg_interval)
+        self.last_frame_at = now
+        self.next_deadline += self.interval
+
+    def record(self, work_seconds):
+        """Report how long a frame took to produce and adapt the encode settings"""
+        self.avg_work += 0.1 * (work_seconds - self.avg_work)
+        self.frames += 1
+        if self.frames % self.adjust_every:
+            return
+
+        if self.avg_work > 0.9 * self.interval:
+            # Lower quality first, resolution only once quality is at its floor
+            if self.quality > self.min_quality:
+                self.quality = max(self.min_quality, self.quality - 10)
+            elif self.scale_index < len(self.scales) - 1:
+                self.scale_index += 1
+        elif self.avg_work < 0.5 * self.interval:
+            # Recover in the reverse order
+            if self.scale_index > 0:
+                self.scale_index -= 1
+            elif self.quality < self.max_quality:
+                self.quality = min(self.max_quality, self.quality + 5)
+
+    def stats(self):
+        return {
+            "target_fps": self.target_fps,
+            "achieved_fps": 1.0 / self.avg_interval if self.avg_interval else 0.0,
+            "avg_frame_work_ms": self.avg_work * 1000,
+            "jpeg_quality": self.quality,
+            "scale": self.scale,
+            "frames": self.frames,
+            "late_frames": self.late_frames
+        }
@@ -0,0 +1,76 @@
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+
+class FrameSkipCache:
+    def __init__(self, threshold=2.0, max_age=1.0, size=(32, 24)):
+        """
+        Reuse the last result of a stream while its frames barely change
+        Args:
+            threshold: Mean absolute difference (0-255) of the downscaled grayscale
+                frames below which a frame counts as a duplicate
+            max_age: Seconds a result may be reused before inference runs again
+            size: Thumbnail size the comparison runs on
+        """
+        self.threshold = threshold
+        self.max_age = max_age
+        self.size = size
+        self._thumbnail = None
+        self._key = None
+        self._result = None
+        self._inferred_at = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def thumbnail(self, frame):
+        """Tiny grayscale copy of a BGR frame, cheap to compare"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        return cv2.resize(gray, self.size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def lookup(self, thumbnail, key):
+        """
+        Previous result for a near-identical frame
+        Args:
+            thumbnail: Output of thumbnail() for the new frame
+            key: Anything that changes the result besides pixels (pose, options)
+        Returns:
+            Re-timestamped copy of the cached result, or None when inference must run
+        """
+        if self._result is None or key != self._key:
+            self.misses += 1
+            return None
+
+        if time.monotonic() - self._inferred_at > self.max_age:
+            self.stale += 1
+            return None
+
+        if np.abs(thumbnail - self._thumbnail).mean() > self.threshold:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return dict(self._result, timestamp=datetime.now().isoformat(), cached=True)
+
+    def store(self, thumbnail, key, result):
+        """Remember a freshly inferred result; frames without a pose are not cached"""
+        if not result.get("landmarks"):
+            self._result = None
+            return
+        self._thumbnail = thumbnail
+        self._key = key
+        self._result = dict(result)
+        self._inferred_at = time.monotonic()
+
+    def stats(self):
+        lookups = self.hits + self.misses + self.stale
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
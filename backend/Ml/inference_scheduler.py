@@ -0,0 +1,138 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+
+class InferenceOverloaded(Exception):
+    """Raised when the inference queue is full or a frame waited too long"""
+
+
+class InferenceScheduler:
+    def __init__(self, run, workers=2, max_batch=1, max_wait=0.005, max_queue=256):
+        """
+        Bounded scheduler in front of the detectors
+        Args:
+            run: Callable executed for every submitted frame
+            workers: Number of frames processed concurrently
+            max_batch: Maximum frames collected per dispatch round; MediaPipe has no
+                batched call, so each frame still goes to its own free worker
+            max_wait: Seconds to keep a dispatch round open for more frames
+            max_queue: Frames allowed to wait before new ones are rejected
+        """
+        self.run = run
+        self.workers = max(1, int(workers))
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max_wait
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._slots = threading.Semaphore(self.workers)
+        self._ready = queue.Queue()
+        self._stats_lock = threading.Lock()
+
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.batches = 0
+        self.max_queue_depth = 0
+        self.total_queue_wait = 0.0
+        self.batch_size_histogram = {size: 0 for size in range(1, self.max_batch + 1)}
+
+        self._threads = [threading.Thread(target=self._worker_loop, daemon=True) for _ in range(self.workers)]
+        self._threads.append(threading.Thread(target=self._dispatch_loop, daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, *args, **kwargs):
+        """Queue one frame for inference and return a Future for its result"""
+        future = Future()
+        try:
+            self._queue.put_nowait((future, args, kwargs, time.perf_counter()))
+        except queue.Full:
+            with self._stats_lock:
+                self.rejected += 1
+            raise InferenceOverloaded("Inference queue is full")
+
+        with self._stats_lock:
+            self.submitted += 1
+            self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return future
+
+    def infer(self, *args, timeout=None, **kwargs):
+        """Submit a frame and block until its result is ready"""
+        future = self.submit(*args, **kwargs)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            # Drop it if no worker picked it up yet
+            future.cancel()
+            raise InferenceOverloaded(f"No inference result after {timeout}s")
+
+    def queue_depth(self):
+        """Frames currently waiting for a batch"""
+        return self._queue.qsize()
+
+    def _dispatch_loop(self):
+        """Collect frames into batches and hand each frame to a free worker"""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.max_wait
+
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            with self._stats_lock:
+                self.batches += 1
+                self.batch_size_histogram[len(batch)] += 1
+
+            # Backpressure: frames keep queueing while every worker is busy
+            for item in batch:
+                self._slots.acquire()
+                self._ready.put(item)
+
+    def _worker_loop(self):
+        """Worker thread: run frames as the dispatcher hands them over"""
+        while True:
+            self._run_frame(*self._ready.get())
+
+    def _run_frame(self, future, args, kwargs, queued_at):
+        """Run one frame and hand its result back to the waiting request"""
+        try:
+            if not future.set_running_or_notify_cancel():
+                return
+
+            with self._stats_lock:
+                self.total_queue_wait += time.perf_counter() - queued_at
+
+            try:
+                future.set_result(self.run(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+
+            with self._stats_lock:
+                self.completed += 1
+        finally:
+            self._slots.release()
+
+    def stats(self):
+        """Queue depth, throughput counters and batch-size histogram"""
+        with self._stats_lock:
+            avg_wait = self.total_queue_wait / self.completed if self.completed else 0.0
+            return {
+                "workers": self.workers,
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait * 1000,
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self.max_queue_depth,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "batches": self.batches,
+                "avg_queue_wait_ms": avg_wait * 1000,
+                "batch_size_histogram": dict(self.batch_size_histogram)
+            }
@@ -0,0 +1,40 @@
+import base64
+
+import numpy as np
+
+from angle_engine import LANDMARK_NAMES, NUM_LANDMARKS
+
+LANDMARK_FIELDS = ("x", "y", "z", "visibility")
+# "objects" is the original list of named dicts, the others follow LANDMARK_SCHEMA
+LANDMARK_FORMATS = ("objects", "array", "base64")
+
+# Sub-pixel at any practical resolution, and keeps JSON numbers short
+ARRAY_DECIMALS = 5
+
+LANDMARK_SCHEMA = {
+    "count": NUM_LANDMARKS,
+    "names": list(LANDMARK_NAMES),
+    "fields": list(LANDMARK_FIELDS),
+    "formats": {
+        "objects": "List of {x, y, z, visibility, name} dicts (first 15 landmarks)",
+        "array": f"List of {NUM_LANDMARKS} [x, y, z, visibility] rows in `names` order, "
+                 f"rounded to {ARRAY_DECIMALS} decimals",
+        "base64": f"Base64 of {NUM_LANDMARKS * len(LANDMARK_FIELDS)} little-endian float32 values, "
+                  "row-major in `names` then `fields` order"
+    }
+}
+
+
+def encode_landmarks(points, landmark_format):
+    """
+    Serialize a (33, 4) landmark array in one of the compact formats
+    Args:
+        points: float32 array from landmarks_to_array
+        landmark_format: "array" or "base64"
+    """
+    if landmark_format == "array":
+        return points.astype(np.float64).round(ARRAY_DECIMALS).tolist()
+    if landmark_format == "base64":
+        return base64.b64encode(points.astype("<f4", copy=False).tobytes()).decode("ascii")
+    raise ValueError(f"Unknown landmark format: {landmark_format}")
+
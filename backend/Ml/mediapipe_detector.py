@@ -0,0 +1,231 @@
+import base64
+import random
+from datetime import datetime
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from angle_engine import landmarks_to_array
+from landmark_codec import encode_landmarks
+from model_tiers import MODEL_TIERS
+from pose_rules import evaluate_pose
+
+
+class MediaPipePoseDetector:
+    # AnnotationCache serving annotate="url" renders, set by the app
+    annotation_cache = None
+
+    def __init__(self, model_complexity=1):
+        """MediaPipe Pose detection, importable without the Flask app (video workers)"""
+        self.mp_pose = mp.solutions.pose
+        self.mp_drawing = mp.solutions.drawing_utils
+        self.model_complexity = model_complexity
+        self.pose = self._create_pose(model_complexity)
+        # Graphs for other complexity tiers, created on first use
+        self.poses = {model_complexity: self.pose}
+        # Input window (crop, frame size) each tier's graph saw last
+        self._windows = {}
+        print("✅ MediaPipe Pose initialized")
+
+    def _create_pose(self, model_complexity):
+        return self.mp_pose.Pose(
+            static_image_mode=False,
+            model_complexity=model_complexity,
+            smooth_landmarks=True,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+
+    def reset(self):
+        """Drop every graph's tracking ROI and landmark smoothing, e.g. before an unrelated video"""
+        for pose in self.poses.values():
+            pose.reset()
+        self._windows.clear()
+
+    def close(self):
+        """Release every MediaPipe graph"""
+        for pose in self.poses.values():
+            pose.close()
+
+    def decode_image(self, image_data):
+        """Decode base64 image to numpy array"""
+        try:
+            if ',' in image_data:
+                image_data = image_data.split(',')[1]
+
+            img_bytes = base64.b64decode(image_data)
+            nparr = np.frombuffer(img_bytes, np.uint8)
+            img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+
+            if img is None:
+                return None
+
+            return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        except Exception as e:
+            print(f"Image decode error: {e}")
+            return None
+
+    def render_annotation(self, frame, pose_landmarks):
+        """Draw landmarks on a copy of the frame and return it as JPEG bytes"""
+        annotated_frame = frame.copy()
+        self.mp_drawing.draw_landmarks(
+            annotated_frame,
+            pose_landmarks,
+            self.mp_pose.POSE_CONNECTIONS,
+            self.mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
+            self.mp_drawing.DrawingSpec(color=(255, 0, 0), thickness=2, circle_radius=2)
+        )
+        _, buffer = cv2.imencode('.jpg', annotated_frame)
+        return buffer.tobytes()
+
+    def _process(self, image, model_complexity, window=None):
+        """
+        Run MediaPipe on a BGR image with the given model tier
+        window: Part of the source frame the image shows, (crop or None, frame size);
+        the graph is reset when it moves so its tracking ROI and landmark smoothing
+        never carry over from another window's coordinates
+        """
+        pose = self.poses.get(model_complexity)
+        if pose is None:
+            pose = self.poses[model_complexity] = self._create_pose(model_complexity)
+        elif self._windows.get(model_complexity, window) != window:
+            pose.reset()
+        self._windows[model_complexity] = window
+
+        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        image_rgb.flags.writeable = False
+        return pose.process(image_rgb)
+
+    def detect_pose_from_frame(self, frame, pose_type, annotate="inline", roi=None, model_complexity=None,
+                               landmark_format="objects", smoother=None):
+        """
+        Detect pose from OpenCV frame
+        annotate: "inline" embeds the annotated JPEG, "url" defers rendering
+        to /api/ml/annotated/<id>, "none" returns landmarks only
+        roi: The stream's RoiTracker, crops around the previous frame's landmarks
+        model_complexity: MediaPipe tier, defaults to the detector's own
+        landmark_format: "objects" (named dicts), or "array"/"base64" per LANDMARK_SCHEMA
+        smoother: The stream's PoseSmoother; landmarks, angles and is_correct become
+        smoothed over time and a "stability" block reports holds
+        """
+        try:
+            if frame is None:
+                return self._mock_result(pose_type, "No frame")
+
+            if model_complexity is None:
+                model_complexity = self.model_complexity
+
+            height, width = frame.shape[:2]
+            image, crop = roi.crop(frame) if roi is not None else (frame, None)
+
+            # Process with MediaPipe
+            results = self._process(image, model_complexity, (crop, (width, height)))
+
+            if not results.pose_landmarks and crop is not None:
+                # Lost inside the crop, search the whole frame
+                crop = None
+                results = self._process(frame, model_complexity, (None, (width, height)))
+
+            if not results.pose_landmarks:
+                if roi is not None:
+                    roi.update(None, width, height)
+                result = self._mock_result(pose_type, "No landmarks detected")
+                if smoother is not None:
+                    result["stability"] = smoother.lost(pose_type)
+                    result["is_correct"] = result["stability"]["is_correct"]
+                return result
+
+            # Get landmarks in full-frame coordinates
+            landmarks = results.pose_landmarks.landmark
+            if crop is not None:
+                roi.map_landmarks(landmarks, crop, width, height)
+            points = landmarks_to_array(landmarks)
+            if roi is not None:
+                roi.update(points, width, height)
+            if smoother is not None:
+                # Everything below (angles, feedback, confidence) sees the smoothed landmarks
+                points = smoother.smooth(points)
+
+            # Convert landmarks to serializable format
+            if landmark_format == "objects":
+                landmarks_list = []
+                for idx, (x, y, z, visibility) in enumerate(points[:15].tolist()):
+                    landmarks_list.append({
+                        "x": x,
+                        "y": y,
+                        "z": z,
+                        "visibility": visibility,
+                        "name": f"landmark_{idx}"
+                    })
+            else:
+                # All 33 landmarks without per-point names, order from /api/ml/landmarks/schema
+                landmarks_list = encode_landmarks(points, landmark_format)
+
+            # Calculate confidence
+            confidence = float(np.mean(points[:, 3], dtype=np.float64))
+
+            # Real joint angles and rule feedback from the shared compute path
+            angles, corrections, praise, tips = evaluate_pose(points, pose_type)
+            feedback = self._generate_feedback(corrections, praise, tips)
+
+            # Check if pose is correct
+            is_correct = confidence > 0.7
+            if smoother is not None:
+                # Held verdict with hysteresis instead of this frame's alone
+                stability = smoother.update(pose_type, is_correct and not corrections)
+                is_correct = stability["is_correct"]
+
+            result = {
+                "success": True,
+                "pose_type": pose_type,
+                "confidence": confidence,
+                "is_correct": is_correct,
+                "feedback": feedback,
+                "landmarks": landmarks_list,
+                "angles": angles,
+                "detector": f"mediapipe_{MODEL_TIERS[model_complexity]}",
+                "timestamp": datetime.now().isoformat(),
+                "annotated_image": None
+            }
+            if smoother is not None:
+                result["stability"] = stability
+
+            # Annotation is the costliest step, only pay for it when asked
+            if annotate == "inline":
+                jpeg = self.render_annotation(frame, results.pose_landmarks)
+                annotated_image = base64.b64encode(jpeg).decode('utf-8')
+                result["annotated_image"] = f"data:image/jpeg;base64,{annotated_image}"
+            elif annotate == "url":
+                image_id = self.annotation_cache.put(frame, results.pose_landmarks, self.render_annotation)
+                result["annotated_image_url"] = f"/api/ml/annotated/{image_id}"
+
+            return result
+
+        except Exception as e:
+            print(f"Pose detection error: {e}")
+            return self._mock_result(pose_type, f"Error: {e}")
+
+    def _generate_feedback(self, corrections, praise, tips):
+        """Combine rule corrections, praise and pose tips into user feedback"""
+        feedback = corrections + praise + tips
+
+        if not feedback:
+            feedback.append("Good pose! Keep practicing.")
+
+        return feedback
+
+    def _mock_result(self, pose_type, reason=""):
+        """Fallback mock result"""
+        return {
+            "success": True,
+            "pose_type": pose_type,
+            "confidence": 0.75 + random.random() * 0.2,
+            "is_correct": random.choice([True, False]),
+            "feedback": [f"Demo mode: {reason}", "Practice makes perfect!"],
+            "landmarks": [],
+            "angles": {"demo_angle": 90},
+            "detector": "demo_mode",
+            "timestamp": datetime.now().isoformat(),
+            "annotated_image": None
+        }
@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# MediaPipe Pose model_complexity values
+MODEL_TIERS = {0: "lite", 1: "full", 2: "heavy"}
+
+
+class ModelTierPolicy:
+    def __init__(self, default_tier=1, min_tier=0, queue_high=8, queue_low=1,
+                 p95_high_ms=250, p95_low_ms=100, window=200, cooldown=5):
+        """
+        Caps the model complexity while inference is overloaded
+        Args:
+            default_tier: Deployment tier used when a request doesn't ask for one
+            min_tier: Lightest tier the policy may fall back to
+            queue_high, queue_low: Queue depth that triggers a step down / allows a step up
+            p95_high_ms, p95_low_ms: p95 latency that triggers a step down / allows a step up
+            window: Number of recent latencies the p95 is computed over
+            cooldown: Minimum seconds between two tier changes
+        """
+        self.default_tier = default_tier
+        self.min_tier = min_tier
+        self.queue_high = queue_high
+        self.queue_low = queue_low
+        self.p95_high = p95_high_ms / 1000
+        self.p95_low = p95_low_ms / 1000
+        self.cooldown = cooldown
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._changed_at = 0.0
+
+        # Highest tier currently allowed, and highest one served since the last change
+        self.ceiling = max(MODEL_TIERS)
+        self._served = min_tier
+        self.downgrades = 0
+        self.upgrades = 0
+
+    def record(self, seconds):
+        """Add the end-to-end latency of one detection"""
+        self._latencies.append(seconds)
+
+    def p95(self):
+        latencies = list(self._latencies)
+        return float(np.percentile(latencies, 95)) if latencies else 0.0
+
+    def tier(self, requested=None, queue_depth=0):
+        """
+        Model complexity to use for one frame
+        Args:
+            requested: Tier asked for by the request, None for the deployment default
+            queue_depth: Frames currently waiting for inference
+        """
+        now = time.monotonic()
+        if now - self._changed_at >= self.cooldown:
+            with self._lock:
+                if now - self._changed_at >= self.cooldown:
+                    self._adjust(queue_depth, now)
+
+        tier = min(self.default_tier if requested is None else requested, self.ceiling)
+        self._served = max(self._served, tier)
+        return tier
+
+    def _adjust(self, queue_depth, now):
+        """Step the ceiling one tier down under load, one tier up once it has passed"""
+        p95 = self.p95()
+        overloaded = queue_depth > self.queue_high or p95 > self.p95_high
+        # Recover only on evidence gathered at the current tier
+        idle = (queue_depth <= self.queue_low and p95 < self.p95_low
+                and len(self._latencies) >= min(20, self._latencies.maxlen))
+
+        if overloaded and min(self.ceiling, self._served) > self.min_tier:
+            # Step below what is actually being served, not below an unused tier
+            self.ceiling = min(self.ceiling, self._served) - 1
+            self.downgrades += 1
+        elif idle and self.ceiling < max(MODEL_TIERS):
+            self.ceiling += 1
+            self.upgrades += 1
+        else:
+            return
+
+        self._changed_at = now
+        self._served = self.min_tier
+        # Latencies measured on the previous tier no longer apply
+        self._latencies.clear()
+
+    def stats(self):
+        return {
+            "default_tier": self.default_tier,
+            "ceiling": self.ceiling,
+            "ceiling_name": MODEL_TIERS[self.ceiling],
+            "p95_latency_ms": self.p95() * 1000,
+            "downgrades": self.downgrades,
+            "upgrades": self.upgrades
+        }
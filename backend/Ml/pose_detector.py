@@ -6,6 +6,12 @@ import time
 from datetime import datetime
 from typing import List, Dict, Any
 import base64
+import os
+
+from angle_engine import LANDMARK_INDEX, LANDMARK_NAMES, landmarks_to_array
+from pose_rules import POSE_RULES, evaluate_pose
+from progress import ProgressAggregate
+from video_analysis import analyze_video, video_file_from_base64
 
 class YogaPoseDetector:
     def __init__(self):
@@ -48,6 +54,9 @@ class YogaPoseDetector:
                             "RIGHT_SHOULDER", "RIGHT_HIP", "RIGHT_ANKLE"]
             }
         }
+        
+        # Declarative angle/feedback rules, compiled once at import
+        self.pose_rules = POSE_RULES
     
     def calculate_angle(self, a, b, c):
         """Calculate angle between three points"""
@@ -65,8 +74,7 @@ class YogaPoseDetector:
     
     def get_landmark_coordinates(self, landmarks, landmark_name):
         """Get coordinates of a specific landmark"""
-        landmark_index = self.mp_pose.PoseLandmark[landmark_name].value
-        landmark = landmarks[landmark_index]
+        landmark = landmarks[LANDMARK_INDEX[landmark_name]]
         return [landmark.x, landmark.y, landmark.z]
     
     def detect_pose_from_frame(self, frame, pose_type):
@@ -95,66 +103,12 @@ class YogaPoseDetector:
                     "feedback": []
                 }
             
-            # Get landmarks
+            # Get landmarks as one (33, 4) array for the whole frame
             landmarks = results.pose_landmarks.landmark
+            points = landmarks_to_array(landmarks)
             
-            # Calculate angles based on pose type
-            angles = {}
-            feedback = []
-            
-            if pose_type in self.pose_connections:
-                pose_config = self.pose_connections[pose_type]
-                
-                # Calculate specific angles for the pose
-                if pose_type == "tree_pose":
-                    # Calculate knee angles
-                    left_knee_angle = self.calculate_angle(
-                        self.get_landmark_coordinates(landmarks, "LEFT_HIP"),
-                        self.get_landmark_coordinates(landmarks, "LEFT_KNEE"),
-                        self.get_landmark_coordinates(landmarks, "LEFT_ANKLE")
-                    )
-                    
-                    right_knee_angle = self.calculate_angle(
-                        self.get_landmark_coordinates(landmarks, "RIGHT_HIP"),
-                        self.get_landmark_coordinates(landmarks, "RIGHT_KNEE"),
-                        self.get_landmark_coordinates(landmarks, "RIGHT_ANKLE")
-                    )
-                    
-                    angles["left_knee_angle"] = left_knee_angle
-                    angles["right_knee_angle"] = right_knee_angle
-                    
-                    # Provide feedback
-                    if left_knee_angle < 160 or right_knee_angle < 160:
-                        feedback.append("Bend your knees more for better balance")
-                    
-                elif pose_type == "warrior_pose":
-                    # Calculate front knee angle
-                    front_knee_angle = self.calculate_angle(
-                        self.get_landmark_coordinates(landmarks, "LEFT_HIP"),
-                        self.get_landmark_coordinates(landmarks, "LEFT_KNEE"),
-                        self.get_landmark_coordinates(landmarks, "LEFT_ANKLE")
-                    )
-                    
-                    angles["front_knee_angle"] = front_knee_angle
-                    
-                    # Ideal angle for warrior pose is around 90 degrees
-                    if front_knee_angle < 80:
-                        feedback.append("Bend your front knee more")
-                    elif front_knee_angle > 100:
-                        feedback.append("Straighten your front knee slightly")
-                    
-                elif pose_type == "downward_dog":
-                    # Calculate shoulder-hip angle
-                    shoulder_hip_angle = self.calculate_angle(
-                        self.get_landmark_coordinates(landmarks, "LEFT_WRIST"),
-                        self.get_landmark_coordinates(landmarks, "LEFT_SHOULDER"),
-                        self.get_landmark_coordinates(landmarks, "LEFT_HIP")
-                    )
-                    
-                    angles["shoulder_hip_angle"] = shoulder_hip_angle
-                    
-                    if shoulder_hip_angle < 160:
-                        feedback.append("Straighten your back more")
+            # Calculate angles and corrections from the pose's rules
+            angles, feedback, _, _ = evaluate_pose(points, pose_type)
             
             # Get all landmarks in a serializable format
             landmarks_list = []
@@ -164,11 +118,11 @@ class YogaPoseDetector:
                     "y": landmark.y,
                     "z": landmark.z,
                     "visibility": landmark.visibility,
-                    "name": self.mp_pose.PoseLandmark(idx).name
+                    "name": LANDMARK_NAMES[idx]
                 })
             
             # Calculate pose confidence
-            confidence = np.mean([lm.visibility for lm in landmarks])
+            confidence = np.mean(points[:, 3], dtype=np.float64)
             
             # Check pose correctness
             is_correct = len(feedback) == 0
@@ -193,62 +147,45 @@ class YogaPoseDetector:
                 "feedback": []
             }
     
-    def process_video_stream(self, video_data, pose_type, duration_seconds=30):
+    def process_video_stream(self, video_data, pose_type, duration_seconds=30, analysis_fps=5):
         """
         Process video stream for pose detection
         Args:
             video_data: Base64 encoded video data or video path
             pose_type: Type of pose to analyze
             duration_seconds: Duration to analyze
+            analysis_fps: Frames per second to sample from the video
         Returns:
             Analysis results
         """
+        detect = lambda frame: self.detect_pose_from_frame(frame, pose_type)
+        
+        # Frames are decoded as a stream and folded into running totals
+        if os.path.isfile(video_data):
+            aggregate = analyze_video(detect, video_data, analysis_fps, duration_seconds)
+        else:
+            with video_file_from_base64(video_data) as path:
+                aggregate = analyze_video(detect, path, analysis_fps, duration_seconds)
+        
         results = {
             "pose_type": pose_type,
-            "total_frames": 0,
-            "correct_frames": 0,
-            "avg_confidence": 0,
+            "total_frames": aggregate.total_frames,
+            "detected_frames": aggregate.detected_frames,
+            "correct_frames": aggregate.correct_frames,
+            "avg_confidence": float(aggregate.avg_confidence),
             "session_duration": duration_seconds,
-            "frame_analysis": [],
             "summary": {}
         }
         
-        # For demo purposes, simulating video processing
-        # In production, you would decode base64 video or read from file
-        frame_count = int(duration_seconds * 30)  # Assuming 30 FPS
-        
-        confidences = []
-        
-        for i in range(min(100, frame_count)):  # Process max 100 frames for demo
-            # Simulate frame analysis
-            # In actual implementation, you would extract frames from video
-            
-            # Create a mock result for demo
-            mock_result = {
-                "frame": i,
-                "success": True,
-                "confidence": 0.7 + np.random.random() * 0.3,
-                "is_correct": np.random.choice([True, False], p=[0.8, 0.2]),
-                "feedback": []
-            }
-            
-            if mock_result["is_correct"]:
-                results["correct_frames"] += 1
-            
-            confidences.append(mock_result["confidence"])
-            results["frame_analysis"].append(mock_result)
-            results["total_frames"] += 1
-        
-        if confidences:
-            results["avg_confidence"] = float(np.mean(confidences))
-            results["accuracy_percentage"] = (results["correct_frames"] / results["total_frames"]) * 100
+        if aggregate.detected_frames:
+            results["accuracy_percentage"] = aggregate.accuracy
         
         # Generate summary
         results["summary"] = {
             "accuracy": results.get("accuracy_percentage", 0),
             "duration_seconds": duration_seconds,
             "pose_quality": "Good" if results.get("accuracy_percentage", 0) > 70 else "Needs Improvement",
-            "recommendations": [
+            "recommendations": aggregate.top_feedback(2) or [
                 "Practice consistently for better form",
                 "Focus on alignment in your poses"
             ]
@@ -267,41 +204,8 @@ class YogaPoseDetector:
         if not user_sessions:
             return {"error": "No sessions found"}
         
-        # Calculate metrics
-        total_sessions = len(user_sessions)
-        total_duration = sum(session.get("duration", 0) for session in user_sessions)
-        avg_accuracy = np.mean([session.get("accuracy", 0) for session in user_sessions])
-        
-        # Identify improvement areas
-        common_feedback = []
-        for session in user_sessions:
-            if "feedback" in session:
-                common_feedback.extend(session["feedback"])
-        
-        # Find most frequent feedback
-        if common_feedback:
-            from collections import Counter
-            feedback_counts = Counter(common_feedback)
-            top_feedback = feedback_counts.most_common(3)
-        else:
-            top_feedback = []
-        
-        return {
-            "total_sessions": total_sessions,
-            "total_practice_minutes": total_duration / 60,
-            "average_accuracy": float(avg_accuracy),
-            "improvement_areas": [fb[0] for fb in top_feedback],
-            "recommendations": [
-                f"Practice {3 - total_sessions} more times this week" if total_sessions < 3 else "Great consistency!",
-                "Focus on alignment in your poses",
-                "Try holding poses for longer durations"
-            ],
-            "next_goals": [
-                "Achieve 80% accuracy in all poses",
-                "Complete 5 sessions this week",
-                "Try advanced variations of your current poses"
-            ]
-        }
+        # Same running totals the API maintains incrementally, folded in one pass
+        return ProgressAggregate.from_sessions(user_sessions).report()
 
 
 # Utility function to handle base64 image/video data
@@ -0,0 +1,100 @@
+class RoiTracker:
+    def __init__(self, padding=0.25, min_visibility=0.5, max_area_ratio=0.8, min_size=64):
+        """
+        Region of interest around the previous frame's landmarks for one stream
+        Args:
+            padding: Margin added on each side, as a fraction of the landmark box size
+            min_visibility: Landmarks below this visibility don't shape the box
+            max_area_ratio: Crops covering more of the frame than this use the full frame
+            min_size: Smallest crop side in pixels
+        """
+        self.padding = padding
+        self.min_visibility = min_visibility
+        self.max_area_ratio = max_area_ratio
+        self.min_size = min_size
+        # (x, y, w, h) in pixels of the last frame size, None means full frame
+        self.roi = None
+        self.frame_size = None
+
+        self.cropped_frames = 0
+        self.full_frames = 0
+        self.pixels_saved = 0
+        self.lost = 0
+
+    def crop(self, frame):
+        """
+        Cut the current region of interest out of a frame
+        Returns:
+            (image to run inference on, roi or None for the full frame)
+        """
+        height, width = frame.shape[:2]
+        if self.roi is None or self.frame_size != (width, height):
+            self.roi = None
+            self.full_frames += 1
+            return frame, None
+
+        x, y, w, h = self.roi
+        self.cropped_frames += 1
+        self.pixels_saved += width * height - w * h
+        return frame[y:y + h, x:x + w], self.roi
+
+    def map_landmarks(self, landmarks, roi, width, height):
+        """Convert crop-normalized landmarks to full-frame coordinates in place"""
+        x, y, w, h = roi
+        for lm in landmarks:
+            lm.x = (x + lm.x * w) / width
+            lm.y = (y + lm.y * h) / height
+            # MediaPipe scales z like x
+            lm.z = lm.z * w / width
+
+    def update(self, points, width, height):
+        """
+        Derive the next frame's region from this frame's full-frame landmarks
+        Args:
+            points: (33, 4) landmark array, or None when no pose was found
+            width, height: Frame size in pixels
+        """
+        self.frame_size = (width, height)
+        visible = points[points[:, 3] >= self.min_visibility] if points is not None else None
+        if visible is None or len(visible) < 4:
+            # Tracking lost, the next frame is searched in full
+            if self.roi is not None:
+                self.lost += 1
+            self.roi = None
+            return
+
+        x0, y0 = visible[:, 0].min() * width, visible[:, 1].min() * height
+        x1, y1 = visible[:, 0].max() * width, visible[:, 1].max() * height
+
+        # Keep the current crop while the body stays inside it with half the
+        # margin to spare, so the detector sees a stable input size
+        if self.roi is not None:
+            rx, ry, rw, rh = self.roi
+            pad_x = (x1 - x0) * self.padding / 2
+            pad_y = (y1 - y0) * self.padding / 2
+            inside = (x0 - pad_x >= rx and y0 - pad_y >= ry
+                      and x1 + pad_x <= rx + rw and y1 + pad_y <= ry + rh)
+            if inside and rw * rh <= 2 * (x1 - x0 + 2 * pad_x) * (y1 - y0 + 2 * pad_y):
+                return
+
+        pad_x = max((x1 - x0) * self.padding, (self.min_size - (x1 - x0)) / 2)
+        pad_y = max((y1 - y0) * self.padding, (self.min_size - (y1 - y0)) / 2)
+        left, top = max(0, int(x0 - pad_x)), max(0, int(y0 - pad_y))
+        right, bottom = min(width, int(x1 + pad_x) + 1), min(height, int(y1 + pad_y) + 1)
+
+        if (right - left) * (bottom - top) > self.max_area_ratio * width * height:
+            self.roi = None
+        else:
+            self.roi = (left, top, right - left, bottom - top)
+
+    def reset(self):
+        self.roi = None
+
+    def stats(self):
+        return {
+            "roi": self.roi,
+            "cropped_frames": self.cropped_frames,
+            "full_frames": self.full_frames,
+            "pixels_saved": self.pixels_saved,
+            "tracking_lost": self.lost
+        }
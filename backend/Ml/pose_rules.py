@@ -0,0 +1,133 @@
+import json
+import os
+
+import numpy as np
+
+from angle_engine import LANDMARK_INDEX, compile_angle_table, triplet_angles
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pose_rules.json")
+
+
+class CompiledPoseRules:
+    def __init__(self, pose_type, spec):
+        """
+        Compile one pose's rule spec into index/threshold arrays
+        Args:
+            pose_type: Pose name
+            spec: Dict with "angles", "angle_rules", "proximity_rules" and "tips"; an angle
+                rule checks one "angle", or the "max"/"min" (per "reduce") of several "angles"
+        """
+        self.pose_type = pose_type
+        self.angle_table = compile_angle_table(spec.get("angles", {}))
+        self.tips = list(spec.get("tips", []))
+
+        angle_pos = {name: idx for idx, name in enumerate(self.angle_table.names)}
+        angle_rules = spec.get("angle_rules", [])
+        # One row of angle indices per rule, padded by repeating its first angle
+        rule_angles = [rule["angles"] if "angles" in rule else [rule["angle"]] for rule in angle_rules]
+        width = max(map(len, rule_angles), default=1)
+        self.rule_angle = np.array(
+            [[angle_pos[name] for name in names] + [angle_pos[names[0]]] * (width - len(names))
+             for names in rule_angles],
+            dtype=np.intp
+        ).reshape(-1, width)
+        self.rule_takes_min = np.array([rule.get("reduce", "max") == "min" for rule in angle_rules], dtype=bool)
+        self.lower = np.array([rule.get("min", -np.inf) for rule in angle_rules], dtype=np.float64)
+        self.upper = np.array([rule.get("max", np.inf) for rule in angle_rules], dtype=np.float64)
+        self.below_messages = [rule.get("below") for rule in angle_rules]
+        self.above_messages = [rule.get("above") for rule in angle_rules]
+
+        proximity_rules = spec.get("proximity_rules", [])
+        self.proximity_points = np.array(
+            [[LANDMARK_INDEX[name] for name in rule["points"]] for rule in proximity_rules],
+            dtype=np.intp
+        ).reshape(-1, 2)
+        self.proximity_within = np.array([rule["within"] for rule in proximity_rules], dtype=np.float64)
+        self.proximity_pass = [rule.get("pass") for rule in proximity_rules]
+        self.proximity_fail = [rule.get("fail") for rule in proximity_rules]
+
+        # Every landmark the pose touches, gathered with a single fancy index per frame
+        self.gather_index = np.concatenate([self.angle_table.index.ravel(), self.proximity_points.ravel()])
+        self.num_angle_points = self.angle_table.index.size
+
+    def evaluate(self, points):
+        """
+        Run every rule of the pose against one frame
+        Args:
+            points: (33, 4) landmark array from landmarks_to_array
+        Returns:
+            (angles dict, corrections list, praise list)
+        """
+        gathered = points[:, :2].astype(np.float64)[self.gather_index]
+        angles = triplet_angles(gathered[:self.num_angle_points].reshape(-1, 3, 2))
+        corrections = []
+        praise = []
+
+        if len(self.rule_angle):
+            grouped = angles[self.rule_angle]
+            values = np.where(self.rule_takes_min, grouped.min(axis=1), grouped.max(axis=1))
+            violated = np.flatnonzero((values < self.lower) | (values > self.upper))
+            for idx in violated.tolist():
+                below = values[idx] < self.lower[idx]
+                msg = (self.below_messages if below else self.above_messages)[idx]
+                # Several rules may share one message
+                if msg and msg not in corrections:
+                    corrections.append(msg)
+
+        if len(self.proximity_within):
+            # Landmark pairs closer than `within` on both x and y
+            pairs = gathered[self.num_angle_points:].reshape(-1, 2, 2)
+            near = (np.abs(pairs[:, 0] - pairs[:, 1]).max(axis=1) < self.proximity_within).tolist()
+            for idx, is_near in enumerate(near):
+                msg = self.proximity_pass[idx] if is_near else self.proximity_fail[idx]
+                if msg:
+                    (praise if is_near else corrections).append(msg)
+
+        return dict(zip(self.angle_table.names, angles.tolist())), corrections, praise
+
+
+def load_pose_rules(path=None):
+    """Load the declarative rule file and compile every pose once"""
+    with open(path or DEFAULT_RULES_PATH) as f:
+        specs = json.load(f)
+    return {pose_type: CompiledPoseRules(pose_type, spec) for pose_type, spec in specs.items()}
+
+
+# Compiled once at import, shared by every detector instance
+POSE_RULES = load_pose_rules()
+
+
+def evaluate_pose(points, pose_type):
+    """
+    Shared landmark-to-angles path used by every detector
+    Args:
+        points: (33, 4) landmark array from landmarks_to_array
+        pose_type: Pose to evaluate
+    Returns:
+        (angles dict, corrections list, praise list, tips list), all empty for unknown poses
+    """
+    rules = POSE_RULES.get(pose_type)
+    if rules is None:
+        return {}, [], [], []
+
+    angles, corrections, praise = rules.evaluate(points)
+    return angles, corrections, praise, rules.tips
+
+
+if __name__ == "__main__":
+    # Per-frame cost of real angles + feedback, budget is 50us
+    import timeit
+    from types import SimpleNamespace
+
+    from angle_engine import NUM_LANDMARKS, landmarks_to_array
+
+    raw = np.random.default_rng(0).random((NUM_LANDMARKS, 4), dtype=np.float32).tolist()
+    landmarks = [SimpleNamespace(x=x, y=y, z=z, visibility=v) for x, y, z, v in raw]
+
+    runs = 5000
+    for pose_type in POSE_RULES:
+        per_frame = min(timeit.repeat(
+            lambda: evaluate_pose(landmarks_to_array(landmarks), pose_type), number=runs, repeat=5
+        )) / runs
+        status = "ok" if per_frame < 50e-6 else "OVER BUDGET"
+        print(f"{pose_type:14s} {per_frame * 1e6:6.1f} us/frame  {status}")
@@ -0,0 +1,189 @@
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+from angle_engine import NUM_LANDMARKS
+
+
+class PoseSmoother:
+    def __init__(self, time_constant=0.1, score_time_constant=0.5, enter_score=0.7, exit_score=0.3,
+                 hold_marks=(3, 5, 10, 30), max_gap=1.0, max_step=0.5, history=64):
+        """
+        Temporal smoothing and hold detection for one stream's frames
+        Args:
+            time_constant: Seconds over which landmark noise is averaged out
+            score_time_constant: Seconds over which the per-frame correct/incorrect signal is averaged
+            enter_score: Smoothed score at or above which the pose counts as correct
+            exit_score: Smoothed score below which it stops counting as correct
+            hold_marks: Hold durations in seconds that each emit a "held" event
+            max_gap: Seconds without frames after which smoothing starts over, raised to
+                three of the stream's typical frame intervals for slow clients
+            max_step: Largest share of the way to a new verdict one frame can move the score,
+                so a single frame never enters or leaves a hold however sparse frames are
+            history: Frames and events kept in the per-stream ring buffers
+        """
+        self.time_constant = time_constant
+        self.score_time_constant = score_time_constant
+        self.enter_score = enter_score
+        self.exit_score = exit_score
+        self.hold_marks = tuple(sorted(hold_marks))
+        self.max_gap = max_gap
+        self.max_step = max_step
+
+        self._points = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+        self._has_points = False
+        self._points_at = 0.0
+
+        self._pose_type = None
+        self._score = 0.0
+        self._scored_at = None
+        self.is_correct = False
+        self._held_since = None
+        self._next_mark = 0
+
+        # Ring of recent frames: monotonic time and whether the frame itself passed
+        self._frame_times = np.zeros(history)
+        self._frame_passed = np.zeros(history, dtype=bool)
+        self._frame_count = 0
+        # Frame count when the current pose started, pass_rate only looks at frames since
+        self._pose_frames_from = 0
+        self.events = deque(maxlen=history)
+
+        self.holds = 0
+        self.longest_hold = 0.0
+
+    def _alpha(self, elapsed, time_constant):
+        """EMA weight of a new sample, scaled to the time since the previous one"""
+        if time_constant <= 0:
+            return 1.0
+        return 1.0 - math.exp(-max(elapsed, 0.0) / time_constant)
+
+    def _stalled(self, elapsed):
+        """Whether a gap between frames is long enough to start over"""
+        if elapsed <= self.max_gap:
+            return False
+        count = min(self._frame_count, len(self._frame_times))
+        if count < 2:
+            return True
+        interval = float(np.median(np.diff(np.sort(self._frame_times[:count]))))
+        return elapsed > 3 * interval
+
+    def smooth(self, points, now=None):
+        """
+        Exponentially smoothed copy of a (33, 4) landmark array
+        Angles and confidence computed from it are smoothed along with it
+        """
+        now = time.monotonic() if now is None else now
+        if not self._has_points or self._stalled(now - self._points_at):
+            self._points[:] = points
+            self._has_points = True
+        else:
+            alpha = self._alpha(now - self._points_at, self.time_constant)
+            self._points += alpha * (points - self._points)
+        self._points_at = now
+        return self._points.copy()
+
+    def update(self, pose_type, passed, now=None):
+        """
+        Feed one frame's verdict through the hysteresis and hold clock
+        Args:
+            pose_type: Pose the frame was evaluated against, a change starts over
+            passed: Whether this frame alone looks correct; False when no pose was found
+        Returns:
+            Stability dict with the held verdict and the events this frame produced
+        """
+        now = time.monotonic() if now is None else now
+        events = []
+        if pose_type != self._pose_type or self._scored_at is None or self._stalled(now - self._scored_at):
+            # New pose or a stalled stream: a running hold ended with the last frame seen,
+            # and the verdict starts from "not correct" so hysteresis applies from the first frame
+            events += self._end_hold(self._scored_at)
+            if pose_type != self._pose_type:
+                self._pose_frames_from = self._frame_count
+            self._pose_type = pose_type
+            self._score = 0.0
+            alpha = self.max_step
+        else:
+            alpha = min(self._alpha(now - self._scored_at, self.score_time_constant), self.max_step)
+        self._score += alpha * ((1.0 if passed else 0.0) - self._score)
+        self._scored_at = now
+
+        index = self._frame_count % len(self._frame_times)
+        self._frame_times[index] = now
+        self._frame_passed[index] = passed
+        self._frame_count += 1
+
+        # Hysteresis: only cross over once the smoothed score clears the far threshold
+        if not self.is_correct and self._score >= self.enter_score:
+            self.is_correct = True
+            self._held_since = now
+            self._next_mark = 0
+            events.append(self._event("hold_started", 0.0))
+        elif self.is_correct and self._score < self.exit_score:
+            events += self._end_hold(now)
+
+        held = now - self._held_since if self.is_correct else 0.0
+        while self.is_correct and self._next_mark < len(self.hold_marks) and held >= self.hold_marks[self._next_mark]:
+            events.append(self._event("held", self.hold_marks[self._next_mark]))
+            self._next_mark += 1
+
+        self.events.extend(events)
+        return {
+            "is_correct": self.is_correct,
+            "frame_passed": passed,
+            "score": self._score,
+            "hold_seconds": held,
+            "pass_rate": self.pass_rate(),
+            "events": events
+        }
+
+    def lost(self, pose_type, now=None):
+        """Frame without a pose: restart landmark smoothing and count it as not passing"""
+        self._has_points = False
+        return self.update(pose_type, False, now)
+
+    def _end_hold(self, now):
+        """Close the current hold, if any, and return its end event"""
+        if not self.is_correct:
+            return []
+        held = now - self._held_since
+        self.is_correct = False
+        self._held_since = None
+        self.holds += 1
+        self.longest_hold = max(self.longest_hold, held)
+        return [self._event("hold_ended", held)]
+
+    def _event(self, kind, seconds):
+        return {"type": kind, "pose_type": self._pose_type, "seconds": seconds}
+
+    def pass_rate(self):
+        """Fraction of the frames in the ring that passed on their own"""
+        size = len(self._frame_passed)
+        count = min(self._frame_count - self._pose_frames_from, size)
+        if not count:
+            return 0.0
+        recent = np.arange(self._frame_count - count, self._frame_count) % size
+        return float(self._frame_passed[recent].mean())
+
+    def frame_rate(self):
+        """Frames per second across the ring"""
+        count = min(self._frame_count, len(self._frame_times))
+        if count < 2:
+            return 0.0
+        size = len(self._frame_times)
+        newest = self._frame_times[(self._frame_count - 1) % size]
+        oldest = self._frame_times[(self._frame_count - count) % size]
+        return (count - 1) / (newest - oldest) if newest > oldest else 0.0
+
+    def stats(self):
+        return {
+            "is_correct": self.is_correct,
+            "frame_rate": self.frame_rate(),
+            "score": self._score,
+            "pass_rate": self.pass_rate(),
+            "holds": self.holds,
+            "longest_hold": self.longest_hold,
+            "recent_events": list(self.events)
+        }
@@ -0,0 +1,339 @@
+import math
+import threading
+from collections import Counter
+from datetime import date, datetime
+
+# Rollup rows kept per user; streaks themselves are tracked for all history
+DAILY_ROLLUP_DAYS = 400
+WEEKLY_ROLLUP_WEEKS = 160
+
+
+def _add_exact(partials, x):
+    """Add x to a list of non-overlapping partial sums (the algorithm behind math.fsum)"""
+    i = 0
+    for y in partials:
+        if abs(x) < abs(y):
+            x, y = y, x
+        hi = x + y
+        lo = y - (hi - x)
+        if lo:
+            partials[i] = lo
+            i += 1
+        x = hi
+    partials[i:] = [x]
+
+
+def session_day(session):
+    """Local calendar day of a session as a date ordinal, None if it has no timestamp"""
+    timestamp = session.get("timestamp") or session.get("date")
+    if not timestamp:
+        return None
+    try:
+        return datetime.fromisoformat(timestamp).date().toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+def session_timestamp(session):
+    """Epoch seconds of a session, None if it has no timestamp"""
+    try:
+        return datetime.fromisoformat(session.get("timestamp") or "").timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _week_start(day):
+    """Ordinal of the Monday starting the week of a day ordinal"""
+    return day - date.fromordinal(day).weekday()
+
+
+def _rollup_row(day, row):
+    sessions, duration, accuracy_sum = row
+    return {
+        "date": date.fromordinal(day).isoformat(),
+        "sessions": sessions,
+        "practice_minutes": duration / 60,
+        "average_accuracy": accuracy_sum / sessions if sessions else 0.0
+    }
+
+
+def session_metrics(session):
+    """
+    (duration seconds, accuracy %, feedback list) of one stored session
+    Analyzed videos carry duration/accuracy, single frames count as 0s at 100% or 0%
+    """
+    result = session.get("result")
+    if result is not None and "accuracy" not in session:
+        return 0, 100.0 if result.get("is_correct") else 0.0, result.get("feedback", [])
+
+    duration = session.get("duration_seconds", session.get("duration", 0))
+    return duration, session.get("accuracy", 0), session.get("feedback", [])
+
+
+class FeedbackTopK:
+    def __init__(self, capacity=64):
+        """
+        Space-saving top-k counter over feedback messages
+        Exact while there are at most `capacity` distinct messages, which holds
+        for the rule-based feedback; beyond that memory stays at `capacity`
+        """
+        self.capacity = capacity
+        self.counts = Counter()
+
+    def update(self, messages):
+        for message in messages:
+            if message in self.counts or len(self.counts) < self.capacity:
+                self.counts[message] += 1
+                continue
+            # Replace the rarest message, inheriting its count as error bound
+            rarest, count = min(self.counts.items(), key=lambda item: item[1])
+            del self.counts[rarest]
+            self.counts[message] = count + 1
+
+    def most_common(self, n):
+        return self.counts.most_common(n)
+
+
+class ProgressAggregate:
+    def __init__(self, weekly_goal=5):
+        """
+        Running per-user totals, updated in O(1) per recorded session
+        Args:
+            weekly_goal: Sessions per week the user aims for
+        """
+        self.weekly_goal = weekly_goal
+        self.total_sessions = 0
+        # Exact sums so incremental and full recomputation agree bit for bit
+        self.duration_partials = []
+        self.accuracy_partials = []
+        self.feedback = FeedbackTopK()
+
+        # day / week-start ordinal -> [sessions, duration seconds, accuracy sum]
+        self.daily = {}
+        self.weekly = {}
+        # Run of consecutive practice days ending at last_day
+        self.last_day = None
+        self.current_run = 0
+        self.longest_streak = 0
+        # Epoch seconds of the newest session
+        self.last_active = None
+
+    def add(self, session):
+        duration, accuracy, feedback = session_metrics(session)
+        self.total_sessions += 1
+        _add_exact(self.duration_partials, float(duration))
+        _add_exact(self.accuracy_partials, float(accuracy))
+        self.feedback.update(feedback)
+
+        timestamp = session_timestamp(session)
+        if timestamp is not None and (self.last_active is None or timestamp > self.last_active):
+            self.last_active = timestamp
+
+        day = session_day(session)
+        if day is not None:
+            self._add_rollups(day, float(duration), float(accuracy))
+
+    def _add_rollups(self, day, duration, accuracy):
+        """Update the day/week rows and the streak a session falls into"""
+        for table, key, limit in ((self.daily, day, DAILY_ROLLUP_DAYS),
+                                  (self.weekly, _week_start(day), WEEKLY_ROLLUP_WEEKS)):
+            row = table.get(key)
+            if row is None:
+                row = table[key] = [0, 0.0, 0.0]
+                if len(table) > limit:
+                    # Late sessions can add an older row, so evict by key, not insertion order
+                    del table[min(table)]
+            row[0] += 1
+            row[1] += duration
+            row[2] += accuracy
+
+        if self.last_day is None or day == self.last_day + 1:
+            self.current_run += 1
+        elif day > self.last_day + 1:
+            self.current_run = 1
+        elif day < self.last_day:
+            # Late arrival for an earlier day may join two runs
+            self._rebuild_streaks()
+            return
+        else:
+            return
+        self.last_day = day
+        self.longest_streak = max(self.longest_streak, self.current_run)
+
+    def _rebuild_streaks(self):
+        """Recompute runs from the daily rollups (only for out-of-order sessions)"""
+        run = 0
+        previous = None
+        for day in sorted(self.daily):
+            run = run + 1 if previous is not None and day == previous + 1 else 1
+            previous = day
+            self.longest_streak = max(self.longest_streak, run)
+        self.current_run = run
+
+    def streaks(self, today=None):
+        """Current/longest streak and progress toward this week's goal"""
+        today = (today or date.today()).toordinal()
+        # A streak stays alive until a full day is missed
+        alive = self.last_day is not None and self.last_day >= today - 1
+        this_week = self.weekly.get(_week_start(today), [0, 0.0, 0.0])
+        return {
+            "current_streak": self.current_run if alive else 0,
+            "longest_streak": self.longest_streak,
+            "weekly_goal": f"{self.weekly_goal} sessions",
+            "weekly_sessions": this_week[0],
+            "weekly_goal_progress": min(1.0, this_week[0] / self.weekly_goal) if self.weekly_goal else 1.0
+        }
+
+    def rollups(self, today=None, days=7, weeks=4):
+        """Most recent daily and weekly rollup rows, newest last"""
+        today = (today or date.today()).toordinal()
+        return {
+            "daily": [_rollup_row(day, self.daily[day])
+                      for day in range(today - days + 1, today + 1) if day in self.daily],
+            "weekly": [_rollup_row(week, self.weekly[week])
+                       for week in range(_week_start(today) - 7 * (weeks - 1), _week_start(today) + 1, 7)
+                       if week in self.weekly]
+        }
+
+    @property
+    def total_duration(self):
+        return math.fsum(self.duration_partials)
+
+    @property
+    def accuracy_total(self):
+        return math.fsum(self.accuracy_partials)
+
+    @property
+    def average_accuracy(self):
+        return self.accuracy_total / self.total_sessions if self.total_sessions else 0.0
+
+    def to_dict(self):
+        return {
+            "total_sessions": self.total_sessions,
+            "duration_partials": self.duration_partials,
+            "accuracy_partials": self.accuracy_partials,
+            "feedback": list(self.feedback.counts.items()),
+            "daily": list(self.daily.items()),
+            "weekly": list(self.weekly.items()),
+            "last_day": self.last_day,
+            "current_run": self.current_run,
+            "longest_streak": self.longest_streak,
+            "last_active": self.last_active
+        }
+
+    @classmethod
+    def from_dict(cls, state, weekly_goal=5):
+        aggregate = cls(weekly_goal)
+        aggregate.total_sessions = state["total_sessions"]
+        aggregate.duration_partials = list(state["duration_partials"])
+        aggregate.accuracy_partials = list(state["accuracy_partials"])
+        aggregate.feedback.counts = Counter(dict(state["feedback"]))
+        aggregate.daily = {day: row for day, row in state.get("daily", [])}
+        aggregate.weekly = {week: row for week, row in state.get("weekly", [])}
+        aggregate.last_day = state.get("last_day")
+        aggregate.current_run = state.get("current_run", 0)
+        aggregate.longest_streak = state.get("longest_streak", 0)
+        aggregate.last_active = state.get("last_active")
+        return aggregate
+
+    @classmethod
+    def from_sessions(cls, sessions, weekly_goal=5):
+        """Full recomputation over a session list"""
+        aggregate = cls(weekly_goal)
+        for session in sessions:
+            aggregate.add(session)
+        return aggregate
+
+    def report(self, today=None):
+        """Progress report built from the totals and rollups alone"""
+        total_sessions = self.total_sessions
+        return {
+            "total_sessions": total_sessions,
+            "total_practice_minutes": self.total_duration / 60,
+            "average_accuracy": self.average_accuracy,
+            "improvement_areas": [message for message, _ in self.feedback.most_common(3)],
+            "recommendations": [
+                f"Practice {3 - total_sessions} more times this week" if total_sessions < 3 else "Great consistency!",
+                "Focus on alignment in your poses",
+                "Try holding poses for longer durations"
+            ],
+            "next_goals": [
+                "Achieve 80% accuracy in all poses",
+                "Complete 5 sessions this week",
+                "Try advanced variations of your current poses"
+            ],
+            "streaks": self.streaks(today),
+            "rollups": self.rollups(today)
+        }
+
+
+class ProgressTracker:
+    def __init__(self, store=None, weekly_goal=5, columns=None):
+        """
+        Per-user progress aggregates, restored from and saved to a session store
+        Args:
+            store: Session store with load_states()/save_state(), None keeps them in memory only;
+                save_state gets a snapshot callable, so state is only serialized when written
+            weekly_goal: Sessions per week counted toward the weekly goal
+            columns: SessionColumns kept in step with every aggregate, for batch reports
+        """
+        self.store = store
+        # Only snapshot aggregates when the store actually keeps them
+        self.persistent = getattr(store, "persists_state", False)
+        self.weekly_goal = weekly_goal
+        self._lock = threading.Lock()
+        self._aggregates = {}
+        if store is not None:
+            for user_id, state in store.load_states().items():
+                self._aggregates[user_id] = ProgressAggregate.from_dict(state, weekly_goal)
+        self.columns = columns
+        if columns is not None:
+            for user_id, aggregate in self._aggregates.items():
+                columns.update(user_id, aggregate, aggregate.daily)
+
+    def record(self, user_id, session):
+        """Fold a newly stored session into its user's aggregate"""
+        with self._lock:
+            aggregate = self._aggregates.get(user_id)
+            if aggregate is None:
+                aggregate = self._aggregates[user_id] = ProgressAggregate(self.weekly_goal)
+            aggregate.add(session)
+            if self.columns is not None:
+                self.columns.update(user_id, aggregate, (session_day(session),))
+        if self.persistent:
+            # O(1) here: the store's writer takes the snapshot once per batch
+            self.store.save_state(user_id, lambda: self._snapshot(user_id))
+
+    def _snapshot(self, user_id):
+        """Serializable state of a user's aggregate, taken under the tracker lock"""
+        with self._lock:
+            return self._aggregates[user_id].to_dict()
+
+    def report(self, user_id):
+        """Progress report for a user, independent of how many sessions they have"""
+        with self._lock:
+            aggregate = self._aggregates.get(user_id) or ProgressAggregate(self.weekly_goal)
+            return aggregate.report()
+
+    def check_columns(self, today=None):
+        """
+        Users whose batch summary disagrees with their own report, empty when in step
+        Meant for startup: sessions recorded while it runs can show up as mismatches
+        """
+        reports = self.columns.batch_report(today=today)
+        mismatched = []
+        with self._lock:
+            for user_id, aggregate in self._aggregates.items():
+                streaks = aggregate.streaks(today)
+                expected = (aggregate.total_sessions, aggregate.total_duration / 60, aggregate.average_accuracy,
+                            streaks["current_streak"], streaks["longest_streak"])
+                batch = reports.get(user_id)
+                if batch is None or expected != (batch["total_sessions"], batch["total_practice_minutes"],
+                                                 batch["average_accuracy"], batch["current_streak"],
+                                                 batch["longest_streak"]):
+                    mismatched.append(user_id)
+        return mismatched
+
+    def stats(self):
+        with self._lock:
+            return {"users": len(self._aggregates)}
@@ -0,0 +1,190 @@
+import threading
+from datetime import date, datetime
+
+import numpy as np
+
+# Per-user columns, mirrored from each user's ProgressAggregate
+_USER_COLUMNS = (
+    ("sessions", np.int64),
+    ("duration", np.float64),
+    ("accuracy", np.float64),
+    ("last_active", np.float64),
+    ("last_day", np.int32),
+    ("current_run", np.int64),
+    ("longest_streak", np.int64),
+)
+
+# One row per (user, day) of the aggregates' daily rollups; user -1 marks a trimmed row
+_DAY_COLUMNS = (
+    ("user", np.int32),
+    ("day", np.int32),
+    ("sessions", np.int64),
+    ("duration", np.float64),
+    ("accuracy", np.float64),
+)
+
+
+def _grow(columns, size, capacity):
+    """Copies of the columns with room for `capacity` rows"""
+    grown = {}
+    for name, column in columns.items():
+        grown[name] = np.empty(capacity, column.dtype)
+        grown[name][:size] = column[:size]
+    return grown
+
+
+class SessionColumns:
+    def __init__(self, initial_users=1024, initial_rows=4096):
+        """
+        Columnar copy of every user's progress aggregate, for reports over many users
+        Totals and streaks come from the aggregates themselves and daily rows from their
+        rollups, so batch and per-user figures agree across restarts and retention trims
+        Args:
+            initial_users: Starting user capacity, doubled as users arrive
+            initial_rows: Starting daily row capacity, doubled as days arrive
+        """
+        self._user_capacity = max(4, int(initial_users))
+        self._users = {name: np.empty(self._user_capacity, dtype) for name, dtype in _USER_COLUMNS}
+        self._user_codes = {}
+        self._user_ids = []
+
+        self._capacity = max(4, int(initial_rows))
+        self._days = {name: np.empty(self._capacity, dtype) for name, dtype in _DAY_COLUMNS}
+        self._size = 0
+        # Per user code: day ordinal -> row index
+        self._day_rows = []
+        self._trimmed = 0
+        self._lock = threading.Lock()
+
+        self.compactions = 0
+
+    def update(self, user_id, aggregate, days=()):
+        """
+        Copy a user's aggregate after it changed; the caller holds the aggregate's lock
+        Args:
+            days: Day ordinals whose rollup rows changed
+        """
+        with self._lock:
+            code = self._user_codes.get(user_id)
+            if code is None:
+                code = self._add_user(user_id)
+
+            users = self._users
+            users["sessions"][code] = aggregate.total_sessions
+            users["duration"][code] = aggregate.total_duration
+            users["accuracy"][code] = aggregate.accuracy_total
+            users["last_active"][code] = np.nan if aggregate.last_active is None else aggregate.last_active
+            users["last_day"][code] = -1 if aggregate.last_day is None else aggregate.last_day
+            users["current_run"][code] = aggregate.current_run
+            users["longest_streak"][code] = aggregate.longest_streak
+
+            rows = self._day_rows[code]
+            for day in days:
+                row = aggregate.daily.get(day)
+                if row is not None:
+                    self._set_day(code, rows, day, row)
+
+            if len(rows) > len(aggregate.daily):
+                # The aggregate trimmed its oldest rollup rows
+                for day in [day for day in rows if day not in aggregate.daily]:
+                    self._days["user"][rows.pop(day)] = -1
+                    self._trimmed += 1
+                if self._trimmed > self._size // 2:
+                    self._compact()
+
+    def _add_user(self, user_id):
+        code = self._user_codes[user_id] = len(self._user_ids)
+        self._user_ids.append(user_id)
+        self._day_rows.append({})
+        if code == self._user_capacity:
+            self._user_capacity *= 2
+            self._users = _grow(self._users, code, self._user_capacity)
+        return code
+
+    def _set_day(self, code, rows, day, row):
+        index = rows.get(day)
+        if index is None:
+            if self._size == self._capacity:
+                self._capacity *= 2
+                self._days = _grow(self._days, self._size, self._capacity)
+            index = rows[day] = self._size
+            self._days["user"][index] = code
+            self._days["day"][index] = day
+            self._size += 1
+
+        sessions, duration, accuracy_sum = row
+        self._days["sessions"][index] = sessions
+        self._days["duration"][index] = duration
+        self._days["accuracy"][index] = accuracy_sum
+
+    def _compact(self):
+        """Drop trimmed rows in one copy per column and renumber the row index"""
+        keep = np.flatnonzero(self._days["user"][:self._size] >= 0)
+        for column in self._days.values():
+            column[:len(keep)] = column[keep]
+        self._size = len(keep)
+        self._trimmed = 0
+        self._day_rows = [{} for _ in self._user_ids]
+        for index, (code, day) in enumerate(zip(self._days["user"][:self._size].tolist(),
+                                                self._days["day"][:self._size].tolist())):
+            self._day_rows[code][day] = index
+        self.compactions += 1
+
+    def batch_report(self, user_ids=None, active_since=None, today=None):
+        """
+        Progress summaries for many users in one vectorized pass
+        Args:
+            user_ids: Users to report on, None for every user
+            active_since: datetime, keep only users with a session at or after it
+            today: Date the current streak is measured against
+        Returns:
+            Dict of user id -> summary
+        """
+        today = (today or date.today()).toordinal()
+        with self._lock:
+            count = len(self._user_ids)
+            users = {name: column[:count].copy() for name, column in self._users.items()}
+            day_users = self._days["user"][:self._size].copy()
+            known_ids = list(self._user_ids)
+            codes_by_id = dict(self._user_codes)
+
+        if user_ids is None:
+            selected = np.ones(count, dtype=bool)
+        else:
+            selected = np.zeros(count, dtype=bool)
+            selected[[codes_by_id[user_id] for user_id in user_ids if user_id in codes_by_id]] = True
+
+        if active_since is not None:
+            selected &= users["last_active"] >= active_since.timestamp()
+
+        # Retained daily rows per user, trimmed rows (user -1) don't count
+        active_days = np.bincount(day_users[day_users >= 0], minlength=count)
+
+        # Same rule as ProgressAggregate.streaks: alive until a full day is missed
+        alive = (users["last_day"] >= 0) & (users["last_day"] >= today - 1)
+        current_streak = np.where(alive, users["current_run"], 0)
+
+        sessions = users["sessions"]
+        reports = {}
+        for code in np.flatnonzero(selected).tolist():
+            total = int(sessions[code])
+            last_active = users["last_active"][code]
+            reports[known_ids[code]] = {
+                "total_sessions": total,
+                "total_practice_minutes": float(users["duration"][code]) / 60,
+                "average_accuracy": float(users["accuracy"][code]) / total if total else 0.0,
+                "last_active": datetime.fromtimestamp(last_active).isoformat() if np.isfinite(last_active) else None,
+                "active_days": int(active_days[code]),
+                "current_streak": int(current_streak[code]),
+                "longest_streak": int(users["longest_streak"][code])
+            }
+        return reports
+
+    def stats(self):
+        with self._lock:
+            return {
+                "users": len(self._user_ids),
+                "day_rows": self._size - self._trimmed,
+                "capacity": self._capacity,
+                "compactions": self.compactions
+            }
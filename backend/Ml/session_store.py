@@ -0,0 +1,333 @@
+import json
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+
+# Response fields never persisted: images and raw landmarks dominate entry size
+PAYLOAD_FIELDS = ("annotated_image", "annotated_image_url", "landmarks")
+
+
+def strip_payload(result):
+    """Copy of a detection result without image/landmark payloads"""
+    return {key: value for key, value in result.items() if key not in PAYLOAD_FIELDS}
+
+
+class MemorySessionStore:
+    persists_state = False
+
+    def __init__(self, max_per_user=500, max_users=10000):
+        """
+        In-process session store with per-user retention caps
+        Args:
+            max_per_user: Sessions kept per user, oldest are dropped first
+            max_users: Users kept, least recently active are dropped first
+        """
+        self.max_per_user = max(1, int(max_per_user))
+        self.max_users = max(1, int(max_users))
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.appended = 0
+        self.evicted_users = 0
+
+    def append(self, user_id, entry):
+        """Record one session entry"""
+        with self._lock:
+            sessions = self._sessions.get(user_id)
+            if sessions is None:
+                sessions = self._sessions[user_id] = deque(maxlen=self.max_per_user)
+            else:
+                self._sessions.move_to_end(user_id)
+            sessions.append(entry)
+            self.appended += 1
+
+            while len(self._sessions) > self.max_users:
+                self._sessions.popitem(last=False)
+                self.evicted_users += 1
+
+    def sessions(self, user_id, limit=None):
+        """Retained sessions of a user, oldest first (the newest `limit` if given)"""
+        with self._lock:
+            sessions = list(self._sessions.get(user_id, ()))
+        return sessions[-limit:] if limit else sessions
+
+    def save_state(self, user_id, snapshot):
+        """Derived per-user state already lives in the caller's memory"""
+
+    def load_states(self):
+        return {}
+
+    def flush(self, timeout=None):
+        return True
+
+    def close(self):
+        pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": "memory",
+                "users": len(self._sessions),
+                "retained_sessions": sum(len(sessions) for sessions in self._sessions.values()),
+                "appended": self.appended,
+                "evicted_users": self.evicted_users,
+                "max_per_user": self.max_per_user
+            }
+
+
+class SQLiteSessionStore:
+    persists_state = True
+
+    def __init__(self, path, max_per_user=500, batch_size=200, flush_interval=1.0, max_pending=10000,
+                 append_timeout=1.0, tail_size=20, max_tail_users=10000):
+        """
+        SQLite-backed session store; a writer thread commits appends in batches
+        Args:
+            path: Database file
+            max_per_user: Sessions kept per user, older rows are deleted
+            batch_size: Maximum writes committed in one transaction
+            flush_interval: Seconds the writer waits to fill a batch
+            max_pending: Queued writes at most; a full queue blocks append() for
+                append_timeout seconds, then the entry is dropped and counted
+            tail_size: Newest sessions per user kept in memory, reads of up to this
+                many are served without touching the table
+            max_tail_users: Users with an in-memory tail, least recently active are dropped first
+        """
+        self.path = path
+        self.max_per_user = max(1, int(max_per_user))
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = flush_interval
+        self.max_pending = max(1, int(max_pending))
+        self.append_timeout = append_timeout
+        self.tail_size = max(1, int(tail_size))
+        self.max_tail_users = max(1, int(max_tail_users))
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db_lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=self.max_pending)
+        # Appends take a sequence number in queue order; the writer records the
+        # highest one committed so reads can tell committed rows from queued entries
+        self._append_lock = threading.Lock()
+        self._next_seq = 0
+        self._committed_seq = 0
+        # user_id -> deque of (seq, entry), newest last; seq 0 for rows read back from the table.
+        # Users in _seeded hold their full newest tail_size, others only what was appended since start
+        self._tails = OrderedDict()
+        self._seeded = set()
+        # user_id -> [(seq, entry)] queued but not yet committed
+        self._pending = {}
+        self._tail_lock = threading.Lock()
+        # user_id -> callable returning that user's latest derived state
+        self._dirty_states = {}
+        self._dirty_lock = threading.Lock()
+
+        with self._db_lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT NOT NULL, data TEXT NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS sessions_user ON sessions (user_id, id)")
+            # Derived per-user state (progress aggregates), kept beyond session retention
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS user_state (user_id TEXT PRIMARY KEY, data TEXT NOT NULL)"
+            )
+
+        self.appended = 0
+        self.batches = 0
+        self.deleted = 0
+        self.dropped = 0
+
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def append(self, user_id, entry):
+        """Queue one session entry, written by the background thread"""
+        data = json.dumps(entry)
+        with self._append_lock:
+            self._next_seq += 1
+            seq = self._next_seq
+            try:
+                # Backpressure while the writer catches up, then shed load rather than grow without bound
+                self._queue.put(("session", user_id, (seq, data)), timeout=self.append_timeout)
+            except queue.Full:
+                self.dropped += 1
+                print(f"⚠️ Session store queue full, dropped a session of {user_id}")
+                return
+            with self._tail_lock:
+                self._tail(user_id).append((seq, entry))
+                self._pending.setdefault(user_id, []).append((seq, entry))
+
+    def _tail(self, user_id):
+        """A user's in-memory tail, created if missing; caller holds _tail_lock"""
+        tail = self._tails.get(user_id)
+        if tail is None:
+            tail = self._tails[user_id] = deque(maxlen=self.tail_size)
+        else:
+            self._tails.move_to_end(user_id)
+        while len(self._tails) > self.max_tail_users:
+            evicted, _ = self._tails.popitem(last=False)
+            self._seeded.discard(evicted)
+        return tail
+
+    def save_state(self, user_id, snapshot):
+        """
+        Mark a user's derived state dirty
+        snapshot() is called on the writer thread, once per batch, so request
+        threads never serialize state
+        """
+        with self._dirty_lock:
+            wake = not self._dirty_states
+            self._dirty_states[user_id] = snapshot
+        if wake:
+            self._queue.put(("state", None, None))
+
+    def load_states(self):
+        """Every saved user state, keyed by user id"""
+        self.flush(timeout=5)
+        with self._db_lock:
+            rows = self._db.execute("SELECT user_id, data FROM user_state").fetchall()
+        return {user_id: json.loads(data) for user_id, data in rows}
+
+    def flush(self, timeout=None):
+        """Wait until everything queued so far is committed"""
+        done = threading.Event()
+        self._queue.put(("flush", done, None))
+        return done.wait(timeout)
+
+    def _next_batch(self):
+        """Writes up to batch_size, flush_interval after the first one, or up to a flush/close"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size and batch[-1][0] not in ("flush", "close"):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_loop(self):
+        while True:
+            batch = self._next_batch()
+            sessions = [(user_id, item) for kind, user_id, item in batch if kind == "session"]
+            with self._dirty_lock:
+                dirty, self._dirty_states = self._dirty_states, {}
+            try:
+                states = {user_id: json.dumps(snapshot()) for user_id, snapshot in dirty.items()}
+                self._write(sessions, states)
+            except sqlite3.Error as e:
+                print(f"Session store write error: {e}")
+            self._forget_pending(sessions)
+
+            for kind, done, _ in batch:
+                if kind == "flush":
+                    done.set()
+                elif kind == "close":
+                    return
+
+    def _forget_pending(self, sessions):
+        """Stop merging a written batch's entries into reads, the table has them now"""
+        if not sessions:
+            return
+        last = sessions[-1][1][0]
+        with self._tail_lock:
+            for user_id in {user_id for user_id, _ in sessions}:
+                pending = [(seq, entry) for seq, entry in self._pending.get(user_id, ()) if seq > last]
+                if pending:
+                    self._pending[user_id] = pending
+                else:
+                    self._pending.pop(user_id, None)
+
+    def _write(self, sessions, states):
+        """Commit one batch and trim the users it touched to their retention cap"""
+        if not sessions and not states:
+            return
+
+        with self._db_lock, self._db:
+            self._db.executemany(
+                "INSERT INTO sessions (user_id, data) VALUES (?, ?)",
+                [(user_id, data) for user_id, (_, data) in sessions]
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO user_state (user_id, data) VALUES (?, ?)", states.items()
+            )
+
+            deleted = 0
+            for user_id in {user_id for user_id, _ in sessions}:
+                deleted += self._db.execute(
+                    "DELETE FROM sessions WHERE user_id = ? AND id <= ("
+                    "SELECT id FROM sessions WHERE user_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                    (user_id, user_id, self.max_per_user)
+                ).rowcount
+            if sessions:
+                self._committed_seq = sessions[-1][1][0]
+
+        self.appended += len(sessions)
+        self.batches += 1
+        self.deleted += deleted
+
+    def sessions(self, user_id, limit=None):
+        """
+        Retained sessions of a user, oldest first (the newest `limit` if given)
+        Never waits for the writer: committed rows are merged with still-queued entries,
+        and once a user's tail is seeded short reads don't touch the table at all
+        """
+        limit = min(limit or self.max_per_user, self.max_per_user)
+        with self._tail_lock:
+            if user_id in self._seeded and limit <= self.tail_size:
+                self._tails.move_to_end(user_id)
+                return [entry for _, entry in self._tails[user_id]][-limit:]
+
+        # The writer commits and advances _committed_seq under _db_lock, and forgets
+        # pending entries only after releasing it, so holding it keeps both views consistent
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT data FROM sessions WHERE user_id = ? ORDER BY id DESC LIMIT ?",
+                (user_id, max(limit, self.tail_size))
+            ).fetchall()
+            merged = [(0, json.loads(data)) for data, in reversed(rows)]
+            with self._tail_lock:
+                merged += [(seq, entry) for seq, entry in self._pending.get(user_id, ())
+                           if seq > self._committed_seq]
+                # Rows plus everything queued after them: the tail is complete from here on
+                tail = self._tail(user_id)
+                tail.clear()
+                tail.extend(merged)
+                self._seeded.add(user_id)
+        return [entry for _, entry in merged[-limit:]]
+
+    def close(self):
+        """Commit pending writes and stop the writer"""
+        self._queue.put(("close", None, None))
+        self._writer.join(timeout=5)
+        with self._db_lock:
+            self._db.close()
+
+    def stats(self):
+        # Counters only, /health must not scan the table
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "pending_writes": self._queue.qsize(),
+            "max_pending": self.max_pending,
+            "dropped": self.dropped,
+            "tail_users": len(self._tails),
+            "appended": self.appended,
+            "batches": self.batches,
+            "deleted": self.deleted,
+            "max_per_user": self.max_per_user
+        }
+
+
+SESSION_STORES = {"memory": MemorySessionStore, "sqlite": SQLiteSessionStore}
+
+
+def create_session_store(backend="memory", **options):
+    """Build the configured session store backend"""
+    if backend not in SESSION_STORES:
+        raise ValueError(f"Unknown session store: {backend}")
+    return SESSION_STORES[backend](**options)
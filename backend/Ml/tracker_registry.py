@@ -0,0 +1,180 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from pose_roi import RoiTracker
+
+
+class StreamContext:
+    def __init__(self, stream_id, detector, skip_cache=None, smoother=None):
+        """Per-stream tracking state: a warm detector owned by one stream"""
+        self.stream_id = stream_id
+        self.detector = detector
+        # Last result, reused for near-duplicate frames
+        self.skip_cache = skip_cache
+        # Smoothed landmarks, held-pose verdict and hold events across frames
+        self.smoother = smoother
+        self.lock = threading.Lock()
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.frames = 0
+        # Set once the registry drops the context; closed once its detector is released
+        self.evicted = False
+        self.closed = False
+        # Crop window derived from this stream's previous landmarks
+        self.roi = RoiTracker()
+
+
+class TrackerRegistry:
+    def __init__(self, factory, max_trackers=64, idle_timeout=300, skip_cache_factory=None,
+                 smoother_factory=None):
+        """
+        Registry of per-stream trackers with LRU and idle-timeout eviction
+        Args:
+            factory: Callable returning a new detector
+            max_trackers: Maximum number of live trackers
+            idle_timeout: Seconds of inactivity before a tracker is evicted
+            skip_cache_factory: Callable returning a stream's FrameSkipCache, None disables it
+            smoother_factory: Callable returning a stream's PoseSmoother, None disables it
+        """
+        self.factory = factory
+        self.skip_cache_factory = skip_cache_factory
+        self.smoother_factory = smoother_factory
+        self.max_trackers = max(1, int(max_trackers))
+        self.idle_timeout = idle_timeout
+        self._contexts = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _close(self, ctx):
+        """Release the detector of an evicted context, or leave it to the frame in flight"""
+        ctx.evicted = True
+        if not ctx.lock.acquire(blocking=False):
+            # Mid-frame: tracker() calls back here once that frame releases the lock
+            return
+        try:
+            if not ctx.closed:
+                ctx.closed = True
+                close = getattr(ctx.detector, "close", None)
+                if close:
+                    close()
+        finally:
+            ctx.lock.release()
+
+    def _evict(self, now):
+        """Drop idle contexts, then least recently used ones over capacity"""
+        evicted = []
+        for stream_id, ctx in list(self._contexts.items()):
+            if now - ctx.last_used < self.idle_timeout:
+                break
+            evicted.append(self._contexts.pop(stream_id))
+
+        while len(self._contexts) > self.max_trackers:
+            _, ctx = self._contexts.popitem(last=False)
+            evicted.append(ctx)
+
+        self.evictions += len(evicted)
+        return evicted
+
+    def _acquire(self, stream_id):
+        """Get the context for a stream, creating its detector on first use"""
+        now = time.time()
+        with self._lock:
+            evicted = self._evict(now)
+            ctx = self._contexts.get(stream_id)
+            if ctx is not None:
+                self._contexts.move_to_end(stream_id)
+                ctx.last_used = now
+                self.hits += 1
+
+        if ctx is None:
+            # Build the detector outside the registry lock, model init is slow
+            detector = self.factory()
+            with self._lock:
+                ctx = self._contexts.get(stream_id)
+                if ctx is None:
+                    skip_cache = self.skip_cache_factory() if self.skip_cache_factory else None
+                    smoother = self.smoother_factory() if self.smoother_factory else None
+                    ctx = StreamContext(stream_id, detector, skip_cache, smoother)
+                    self._contexts[stream_id] = ctx
+                    self.misses += 1
+                    evicted += self._evict(now)
+                else:
+                    evicted.append(StreamContext(stream_id, detector))
+                ctx.last_used = now
+
+        for old in evicted:
+            self._close(old)
+        return ctx
+
+    @contextmanager
+    def tracker(self, stream_id):
+        """Hold the stream's context exclusively while processing one frame"""
+        ctx = self._acquire(stream_id)
+        ctx.lock.acquire()
+        while ctx.closed:
+            # Evicted and closed while waiting for it, start over on a fresh context
+            ctx.lock.release()
+            ctx = self._acquire(stream_id)
+            ctx.lock.acquire()
+        try:
+            ctx.frames += 1
+            ctx.last_used = time.time()
+            yield ctx
+        finally:
+            ctx.lock.release()
+            if ctx.evicted:
+                self._close(ctx)
+
+    def discard(self, stream_id):
+        """Forget a stream's tracker, e.g. when its session ends"""
+        with self._lock:
+            ctx = self._contexts.pop(stream_id, None)
+        if ctx is not None:
+            self._close(ctx)
+
+    def stats(self):
+        """Registry size, hit/miss/eviction counters and ROI cropping totals"""
+        with self._lock:
+            contexts = list(self._contexts.values())
+            return {
+                "active_trackers": len(self._contexts),
+                "max_trackers": self.max_trackers,
+                "idle_timeout": self.idle_timeout,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "roi": {
+                    "cropped_frames": sum(ctx.roi.cropped_frames for ctx in contexts),
+                    "full_frames": sum(ctx.roi.full_frames for ctx in contexts),
+                    "pixels_saved": sum(ctx.roi.pixels_saved for ctx in contexts),
+                    "tracking_lost": sum(ctx.roi.lost for ctx in contexts)
+                },
+                "skip_cache": self._skip_cache_stats(contexts),
+                "smoothing": self._smoothing_stats(contexts)
+            }
+
+    def _skip_cache_stats(self, contexts):
+        """Duplicate-frame hits summed over every live stream"""
+        caches = [ctx.skip_cache for ctx in contexts if ctx.skip_cache is not None]
+        hits = sum(cache.hits for cache in caches)
+        lookups = hits + sum(cache.misses + cache.stale for cache in caches)
+        return {
+            "hits": hits,
+            "misses": sum(cache.misses for cache in caches),
+            "stale": sum(cache.stale for cache in caches),
+            "hit_rate": hits / lookups if lookups else 0.0
+        }
+
+    def _smoothing_stats(self, contexts):
+        """Streams currently holding their pose and hold totals over every live stream"""
+        smoothers = [ctx.smoother for ctx in contexts if ctx.smoother is not None]
+        return {
+            "streams_holding": sum(smoother.is_correct for smoother in smoothers),
+            "holds": sum(smoother.holds for smoother in smoothers),
+            "longest_hold": max((smoother.longest_hold for smoother in smoothers), default=0.0)
+        }
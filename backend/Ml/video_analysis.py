@@ -0,0 +1,315 @@
+import base64
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+# Needed only for streaming uploads, files and base64 payloads decode through OpenCV
+FFMPEG_BIN = shutil.which("ffmpeg")
+
+
+class SessionAggregate:
+    def __init__(self):
+        """Running totals over analyzed frames, constant memory per session"""
+        self.total_frames = 0
+        self.detected_frames = 0
+        self.correct_frames = 0
+        self.confidence_sum = 0.0
+        self.last_timestamp = 0.0
+        # Bounded by the number of distinct rule messages, not by video length
+        self.feedback_counts = Counter()
+
+    def add(self, result, timestamp=None):
+        """Fold one per-frame detection result into the totals"""
+        self.total_frames += 1
+        if timestamp is not None:
+            self.last_timestamp = max(self.last_timestamp, timestamp)
+
+        # Frames without landmarks (no person, decode failure) don't count toward accuracy
+        if not result.get("landmarks"):
+            return
+
+        self.detected_frames += 1
+        self.confidence_sum += result.get("confidence", 0.0)
+        if result.get("is_correct"):
+            self.correct_frames += 1
+        self.feedback_counts.update(result.get("feedback", []))
+
+    def merge(self, other):
+        """Combine with the aggregate of another part of the same video"""
+        self.total_frames += other.total_frames
+        self.detected_frames += other.detected_frames
+        self.correct_frames += other.correct_frames
+        self.confidence_sum += other.confidence_sum
+        self.last_timestamp = max(self.last_timestamp, other.last_timestamp)
+        self.feedback_counts.update(other.feedback_counts)
+        return self
+
+    @property
+    def accuracy(self):
+        """Percentage of detected frames judged correct"""
+        return (self.correct_frames / self.detected_frames) * 100 if self.detected_frames else 0.0
+
+    @property
+    def avg_confidence(self):
+        return self.confidence_sum / self.detected_frames if self.detected_frames else 0.0
+
+    def top_feedback(self, n=3):
+        return [message for message, _ in self.feedback_counts.most_common(n)]
+
+
+@contextmanager
+def video_file_from_base64(video_data):
+    """Write a base64 (or data URL) video to a temp file, removed after use"""
+    if ',' in video_data:
+        video_data = video_data.split(',')[1]
+
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
+    try:
+        temp_file.write(base64.b64decode(video_data))
+        temp_file.close()
+        yield temp_file.name
+    finally:
+        temp_file.close()
+        os.unlink(temp_file.name)
+
+
+def iter_video_frames(path, analysis_fps=5, start_frame=0, end_frame=None):
+    """
+    Stream sampled frames from a video file without holding the whole video
+    Args:
+        path: Video file path
+        analysis_fps: Frames per second to analyze, every Nth frame is sampled
+        start_frame: First frame index to read
+        end_frame: Stop before this frame index (None reads to the end)
+    Yields:
+        (frame_index, timestamp_seconds, BGR frame)
+    """
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise ValueError("Could not open video")
+
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        step = max(1, int(round(fps / analysis_fps))) if analysis_fps else 1
+
+        if start_frame:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+        frame_index = start_frame
+        while end_frame is None or frame_index < end_frame:
+            if frame_index % step == 0:
+                success, frame = cap.read()
+                if not success:
+                    break
+                yield frame_index, frame_index / fps, frame
+            # Skipped frames are only grabbed, never converted to BGR
+            elif not cap.grab():
+                break
+            frame_index += 1
+    finally:
+        cap.release()
+
+
+def analyze_video(detect, path, analysis_fps=5, max_seconds=None, start_frame=0, end_frame=None):
+    """
+    Run pose detection over sampled frames and aggregate incrementally
+    Args:
+        detect: Callable(frame) returning a per-frame detection result
+        path: Video file path
+        analysis_fps: Frames per second to analyze
+        max_seconds: Stop analyzing after this point in the video
+        start_frame, end_frame: Frame range to analyze
+    Returns:
+        SessionAggregate
+    """
+    aggregate = SessionAggregate()
+    for _, timestamp, frame in iter_video_frames(path, analysis_fps, start_frame, end_frame):
+        if max_seconds is not None and timestamp > max_seconds:
+            break
+        aggregate.add(detect(frame), timestamp)
+    return aggregate
+
+
+def _feed_stdin(chunks, stdin):
+    """Copy upload chunks into the decoder until the body ends or the decoder exits"""
+    try:
+        for chunk in chunks:
+            stdin.write(chunk)
+    except (BrokenPipeError, ValueError, OSError):
+        pass
+    finally:
+        try:
+            stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+
+
+def iter_stream_frames(chunks, analysis_fps=5):
+    """
+    Decode a video while it is still being uploaded
+    The input pipe can't seek, so only streamable containers work: WebM/Matroska, or
+    MP4 written fragmented or faststart (moov atom first). A regular MP4 with its moov
+    atom at the end (typical of phone recordings) raises ValueError; use /analyze-session
+    or re-encode it with -movflags +faststart
+    Args:
+        chunks: Iterable of byte chunks, e.g. reads from the request body
+        analysis_fps: Frames per second ffmpeg emits
+    Yields:
+        (frame_index, timestamp_seconds, BGR frame)
+    Peak memory is one decoded frame plus pipe buffers, whatever the video length
+    """
+    if FFMPEG_BIN is None:
+        raise RuntimeError("ffmpeg is required for streaming video analysis")
+
+    # Decoder errors go to a file so a chatty ffmpeg can never block on a full pipe
+    errors = tempfile.TemporaryFile()
+    # yuv4mpegpipe carries the frame size in its header, so any input resolution works
+    proc = subprocess.Popen(
+        [FFMPEG_BIN, "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+         "-vf", f"fps={analysis_fps},scale=trunc(iw/2)*2:trunc(ih/2)*2",
+         "-pix_fmt", "yuv420p", "-f", "yuv4mpegpipe", "pipe:1"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=errors
+    )
+    feeder = threading.Thread(target=_feed_stdin, args=(chunks, proc.stdin), daemon=True)
+    feeder.start()
+
+    try:
+        header = proc.stdout.readline().split()
+        if not header or header[0] != b"YUV4MPEG2":
+            proc.wait()
+            errors.seek(0)
+            raise ValueError(_stream_decode_error(errors.read().decode("utf-8", "replace")))
+        params = {field[:1]: field[1:] for field in header[1:]}
+        width, height = int(params[b"W"]), int(params[b"H"])
+        frame_size = width * height * 3 // 2
+
+        frame_index = 0
+        while proc.stdout.readline().startswith(b"FRAME"):
+            data = proc.stdout.read(frame_size)
+            if len(data) < frame_size:
+                break
+            yuv = np.frombuffer(data, np.uint8).reshape(height * 3 // 2, width)
+            yield frame_index, frame_index / analysis_fps, cv2.cvtColor(yuv, cv2.COLOR_YUV2BGR_I420)
+            frame_index += 1
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+        proc.stdout.close()
+        errors.close()
+        feeder.join(timeout=1)
+
+
+def _stream_decode_error(stderr):
+    """User-facing reason a streamed upload could not be decoded"""
+    if "moov atom not found" in stderr:
+        return ("MP4 upload is not streamable (moov atom at the end); send WebM or a fragmented/faststart "
+                "MP4 (ffmpeg -movflags +faststart), or use /api/ml/analyze-session")
+    detail = stderr.strip().splitlines()
+    return f"Could not decode video stream: {detail[-1]}" if detail else "Could not decode video stream"
+
+
+def analyze_stream(detect, chunks, analysis_fps=5):
+    """analyze_video for an upload stream decoded by iter_stream_frames"""
+    aggregate = SessionAggregate()
+    for _, timestamp, frame in iter_stream_frames(chunks, analysis_fps):
+        aggregate.add(detect(frame), timestamp)
+    return aggregate
+
+
+def video_info(path):
+    """Frame count and fps reported by the container (count may be 0 if unknown)"""
+    cap = cv2.VideoCapture(path)
+    try:
+        return int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), cap.get(cv2.CAP_PROP_FPS) or 30.0
+    finally:
+        cap.release()
+
+
+# Per-process state for analyze_video_parallel workers
+_worker_detector = None
+_worker_detect_kwargs = {}
+
+
+def init_video_worker(detector_factory, detect_kwargs=None):
+    """Process pool initializer: each worker owns one detector and its MediaPipe graph"""
+    global _worker_detector, _worker_detect_kwargs
+    _worker_detector = detector_factory()
+    _worker_detect_kwargs = detect_kwargs or {}
+
+
+def _analyze_chunk(path, pose_type, analysis_fps, start_frame, end_frame):
+    """Worker task: analyze one frame range with this process's detector"""
+    # The worker's video-mode graph last tracked another chunk, possibly another upload
+    reset = getattr(_worker_detector, "reset", None)
+    if reset:
+        reset()
+    detect = lambda frame: _worker_detector.detect_pose_from_frame(frame, pose_type, **_worker_detect_kwargs)
+    return analyze_video(detect, path, analysis_fps, start_frame=start_frame, end_frame=end_frame)
+
+
+def split_frame_ranges(frame_count, chunks):
+    """Split [0, frame_count) into up to `chunks` contiguous (start, end) ranges"""
+    chunks = max(1, min(chunks, frame_count))
+    bounds = [frame_count * i // chunks for i in range(chunks + 1)]
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def analyze_video_parallel(executor, path, pose_type, chunks, analysis_fps=5):
+    """
+    Analyze time ranges of a video concurrently and merge the partial aggregates
+    Args:
+        executor: ProcessPoolExecutor whose workers ran init_video_worker
+        path: Video file path readable by the workers
+        pose_type: Pose to evaluate
+        chunks: Number of ranges, usually the executor's worker count
+        analysis_fps: Frames per second to analyze
+    Returns:
+        SessionAggregate, or None when the container doesn't report a frame count
+    """
+    frame_count, _ = video_info(path)
+    if frame_count <= 0:
+        return None
+
+    # Workers seek to their start frame (OpenCV decodes forward from the
+    # preceding keyframe); sampling uses absolute frame indices so the
+    # merged result samples the same frames as a sequential pass
+    ranges = split_frame_ranges(frame_count, chunks)
+    futures = [
+        executor.submit(_analyze_chunk, path, pose_type, analysis_fps, start, end)
+        for start, end in ranges
+    ]
+
+    aggregate = SessionAggregate()
+    for future in futures:
+        aggregate.merge(future.result())
+    return aggregate
+
+
+def build_session_result(aggregate, pose_type, duration):
+    """Session analysis response built from an aggregate"""
+    accuracy = aggregate.accuracy
+    return {
+        "session_id": f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+        "pose_type": pose_type,
+        "total_frames": aggregate.total_frames,
+        "detected_frames": aggregate.detected_frames,
+        "correct_frames": aggregate.correct_frames,
+        "accuracy": accuracy,
+        "duration_seconds": duration,
+        "analyzed_seconds": aggregate.last_timestamp,
+        "avg_confidence": aggregate.avg_confidence,
+        "summary": {
+            "pose_quality": "Good" if accuracy > 70 else "Needs Improvement",
+            "improvements": aggregate.top_feedback(2) or ["Hold for longer duration", "Focus on breathing"],
+            "score": round(accuracy / 10, 1)
+        }
+    }
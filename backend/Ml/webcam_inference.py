@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+
+from frame_broadcaster import FrameBroadcaster
+
+
+def format_sse(event, data, event_id=None):
+    """Encode one Server-Sent Event, serialized once and shared by every client"""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.insert(0, f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data)}")
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+class WebcamInference:
+    def __init__(self, frames, detect, fps=10, capacity=8):
+        """
+        Background pose inference on the capture loop's frames
+        Args:
+            frames: FrameBroadcaster the capture thread publishes raw frames to
+            detect: Callable(frame, pose_type) returning a detection result
+            fps: Maximum inference rate
+            capacity: Results kept for slow event subscribers
+        """
+        self.frames = frames
+        self.detect = detect
+        self.fps = fps
+        self.pose_type = "tree_pose"
+        # SSE-encoded results, one publish fans out to every client
+        self.events = FrameBroadcaster(capacity)
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        self.processed = 0
+        self.stale_frames = 0
+        self.errors = 0
+        self.last_latency = 0.0
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, pose_type=None, fps=None):
+        """Start the loop, or update pose/rate of the running one"""
+        with self._lock:
+            if pose_type:
+                self.pose_type = pose_type
+            if fps:
+                self.fps = float(fps)
+            if self.running:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=2):
+        with self._lock:
+            self._stop.set()
+            if self._thread is not None:
+                self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _loop(self):
+        """Infer on the newest frame at most `fps` times a second, skipping stale ones"""
+        last_seq, _ = self.frames.latest()
+        next_due = time.monotonic()
+
+        while not self._stop.is_set():
+            delay = next_due - time.monotonic()
+            if delay > 0 and self._stop.wait(delay):
+                break
+            next_due = max(next_due + 1.0 / self.fps, time.monotonic())
+
+            seq, frame = self.frames.read(last_seq, timeout=1)
+            if frame is None:
+                continue
+
+            # Frames captured while the previous inference ran are never analyzed
+            seq, frame = self.frames.latest()
+            if frame is None:
+                continue
+            self.stale_frames += seq - last_seq - 1
+            last_seq = seq
+
+            started = time.perf_counter()
+            try:
+                result = self.detect(frame, self.pose_type)
+            except Exception as e:
+                self.errors += 1
+                self.events.publish(format_sse("error", {"error": str(e)}, seq))
+                continue
+            self.last_latency = time.perf_counter() - started
+            self.processed += 1
+
+            result = dict(result, frame_seq=seq, latency_ms=self.last_latency * 1000)
+            self.events.publish(format_sse("pose", result, seq))
+            # Hold transitions also go out as their own event type
+            for event in result.get("stability", {}).get("events", ()):
+                self.events.publish(format_sse("hold", event, seq))
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "pose_type": self.pose_type,
+            "target_fps": self.fps,
+            "processed": self.processed,
+            "stale_frames": self.stale_frames,
+            "errors": self.errors,
+            "last_latency_ms": self.last_latency * 1000,
+            "events": self.events.stats()
+        }